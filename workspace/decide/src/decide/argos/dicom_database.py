@@ -12,9 +12,292 @@ Modifications include:
 
 from __future__ import annotations
 
+import logging
 import os
+import sqlite3
+import struct
+import sys
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 
 import pydicom
+from pydicom.dataelem import RawDataElement
+from pydicom.filereader import data_element_generator
+from pydicom.tag import Tag
+from pydicom.uid import UID
+
+# The only tags needed to index a file: PatientID, Modality, SOPInstanceUID, SeriesInstanceUID and InstanceNumber.
+_HEADER_TAGS = [Tag(0x10, 0x20), Tag(0x8, 0x60), Tag(0x8, 0x18), Tag(0x20, 0xE), Tag(0x20, 0x13)]
+_HEADER_TAG_SET = frozenset(_HEADER_TAGS)
+_LAST_HEADER_TAG = max(_HEADER_TAGS)
+# Tags picked up by the header scan: the indexing tags and SpecificCharacterSet to decode them.
+_SCAN_TAG_SET = _HEADER_TAG_SET | {Tag(0x8, 0x5)}
+# Bytes read for the header scan, the indexing tags are within the first few kB of a data set.
+_SCAN_BUFFER_SIZE = 16384
+# Explicit VRs with a reserved field and a 4 byte length.
+_LONG_LENGTH_VRS = frozenset(
+    {b"OB", b"OD", b"OF", b"OL", b"OV", b"OW", b"SQ", b"SV", b"UC", b"UN", b"UR", b"UT", b"UV"}
+)
+_UNDEFINED_LENGTH = 0xFFFFFFFF
+_UNPACK_TAG = struct.Struct("<HH").unpack_from
+_UNPACK_UINT16 = struct.Struct("<H").unpack_from
+_UNPACK_UINT32 = struct.Struct("<L").unpack_from
+# TransferSyntaxUID, in the file meta information group.
+_TRANSFER_SYNTAX_TAG = 0x00020010
+# ReferencedFrameOfReferenceSequence, holds the reference to the CT of a RTSTRUCT.
+_RTSTRUCT_REFERENCE_TAGS = [Tag(0x3006, 0x10)]
+# Image modalities that are indexed as CT scans.
+_IMAGE_MODALITIES = frozenset({"CT", "PT", "MR"})
+# Do not update the access time of scanned files, where the platform supports it.
+_O_NOATIME = getattr(os, "O_NOATIME", 0)
+# Marks a value that is not read yet, where None is a valid result.
+_UNRESOLVED = object()
+
+logger = logging.getLogger(__name__)
+
+
+def _iter_dcm(root: str):
+    """Recursively yield the paths of the DICOM (.dcm) files below a folder.
+
+    :param str root: the folder to walk
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_dcm(entry.path)
+            elif entry.name.endswith((".dcm", ".DCM")):
+                yield entry.path
+
+
+def _open_for_scan(file_path: str):
+    """Open a file for a one-shot sequential read of its header.
+
+    Where supported, the access time is not updated (O_NOATIME) and the kernel is told that the file is read
+    sequentially, see _release_scanned for dropping the pages from the page cache again.
+
+    :param str file_path: the file
+    :return BinaryIO: The opened binary file object
+    """
+    try:
+        fd = os.open(file_path, os.O_RDONLY | _O_NOATIME)
+    except PermissionError:
+        # O_NOATIME is only permitted for the owner of the file.
+        fd = os.open(file_path, os.O_RDONLY)
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return os.fdopen(fd, "rb")
+
+
+def _release_scanned(fp):
+    """Tell the kernel that the pages of a scanned file are not needed anymore.
+
+    :param BinaryIO fp: The file object opened with _open_for_scan
+    """
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fp.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _quick_tags(file_path: str) -> pydicom.Dataset | None:
+    """Read the indexing tags of a DICOM file.
+
+    Files without the "DICM" magic after the 128 byte preamble are rejected before pydicom is involved.
+    The data elements are walked with pydicom's low-level generator, which stops as soon as all the indexing
+    tags are found, instead of building a complete FileDataset. Files that can not be read or that have no
+    PatientID, such as partial transfers, are logged and skipped.
+
+    :param str file_path: dicom filepath
+    :return pydicom.Dataset | None: DICOM header with only the indexing tags, None if not a usable DICOM file
+    """
+    try:
+        with _open_for_scan(file_path) as fp:
+            try:
+                dcm_header = _read_quick_tags(fp)
+            finally:
+                _release_scanned(fp)
+    except Exception as e:
+        logger.warning(f"Skipping {file_path}, failed to read the DICOM header: {e}")
+        return None
+    if dcm_header is not None and _HEADER_TAGS[0] not in dcm_header:
+        logger.warning(f"Skipping {file_path}, no PatientID in the DICOM header.")
+        return None
+    return dcm_header
+
+
+def _read_quick_tags(fp) -> pydicom.Dataset | None:
+    """Read the indexing tags from an open DICOM file, see _quick_tags.
+
+    :param BinaryIO fp: The binary file object, at the start of the file
+    :return pydicom.Dataset | None: DICOM header with only the indexing tags, None if not a DICOM file
+    """
+    fp.seek(128)
+    if fp.read(4) != b"DICM":
+        return None
+    transfer_syntax = _read_transfer_syntax(fp)
+    # Private or unknown transfer syntaxes are left to dcmread, which works out their encoding itself.
+    if transfer_syntax is not None and transfer_syntax.is_transfer_syntax and not transfer_syntax.is_deflated:
+        elements = _scan_elements(fp, transfer_syntax)
+        # No PatientID usually means the data set is not encoded as its transfer syntax says, dcmread detects that.
+        if _HEADER_TAGS[0] in elements:
+            return pydicom.Dataset(elements)
+    fp.seek(0)
+    return pydicom.dcmread(fp, stop_before_pixels=True, specific_tags=_HEADER_TAGS)
+
+
+def _scan_elements(fp, transfer_syntax: UID) -> dict:
+    """Find the indexing tags in the data set of a file with a known, not deflated, transfer syntax.
+
+    :param BinaryIO fp: The binary file object, at the start of the data set
+    :param UID transfer_syntax: The transfer syntax of the data set
+    :return dict: Tag -> RawDataElement of the indexing tags found (and SpecificCharacterSet)
+    """
+    if transfer_syntax.is_little_endian:
+        dataset_start = fp.tell()
+        elements = _scan_little_endian(
+            fp.read(_SCAN_BUFFER_SIZE), dataset_start, is_implicit_vr=transfer_syntax.is_implicit_VR
+        )
+        if elements is not None:
+            return elements
+        fp.seek(dataset_start)
+
+    elements = {}
+    remaining = len(_HEADER_TAG_SET)
+    for element in data_element_generator(
+        fp,
+        transfer_syntax.is_implicit_VR,
+        transfer_syntax.is_little_endian,
+        stop_when=_past_header_tags,
+        specific_tags=_HEADER_TAGS,
+    ):
+        # The generator also yields SpecificCharacterSet, it is kept to decode the values.
+        elements[element.tag] = element
+        if element.tag in _HEADER_TAG_SET:
+            remaining -= 1
+            if not remaining:
+                break
+    return elements
+
+
+def _read_transfer_syntax(fp) -> UID | None:
+    """Read the TransferSyntaxUID of the file meta information group, which is always explicit VR little endian.
+
+    :param BinaryIO fp: The binary file object, just after the "DICM" magic
+    :return UID | None: The transfer syntax, None if the file has no TransferSyntaxUID. The file is left at the
+        start of the data set.
+    """
+    transfer_syntax = None
+    while True:
+        element_start = fp.tell()
+        header = fp.read(8)
+        if len(header) < 8 or _UNPACK_UINT16(header)[0] != 0x0002:
+            fp.seek(element_start)
+            return transfer_syntax
+        vr = header[4:6]
+        if vr in _LONG_LENGTH_VRS:
+            length = _UNPACK_UINT32(fp.read(4))[0]
+        else:
+            length = _UNPACK_UINT16(header, 6)[0]
+        tag = _UNPACK_TAG(header)
+        if tag[0] << 16 | tag[1] == _TRANSFER_SYNTAX_TAG:
+            transfer_syntax = UID(fp.read(length).rstrip(b"\0 ").decode("ascii", "replace"))
+        else:
+            fp.seek(length, os.SEEK_CUR)
+
+
+def _scan_little_endian(buffer: bytes, buffer_start: int, *, is_implicit_vr: bool) -> dict | None:
+    """Find the indexing tags in the first bytes of a little endian data set, without pydicom's element generator.
+
+    This covers the clinical majority (implicit and explicit VR little endian), anything it can not decide from the
+    buffer (undefined lengths before the tags, elements beyond the buffer) returns None to use the generator instead.
+
+    :param bytes buffer: The first bytes of the data set, after the file meta information
+    :param int buffer_start: File position of the buffer
+    :param bool is_implicit_vr: True for implicit VR
+    :return dict | None: Tag -> RawDataElement of the indexing tags (and SpecificCharacterSet), None if undecided
+    """
+    elements = {}
+    remaining = len(_HEADER_TAG_SET)
+    offset = 0
+    end = len(buffer)
+    while offset + 8 <= end:
+        group, element = _UNPACK_TAG(buffer, offset)
+        tag = group << 16 | element
+        if tag > _LAST_HEADER_TAG:
+            return elements
+        if is_implicit_vr:
+            vr = None
+            length = _UNPACK_UINT32(buffer, offset + 4)[0]
+            offset += 8
+        else:
+            vr = buffer[offset + 4 : offset + 6]
+            if vr in _LONG_LENGTH_VRS:
+                if offset + 12 > end:
+                    return None
+                length = _UNPACK_UINT32(buffer, offset + 8)[0]
+                offset += 12
+            else:
+                length = _UNPACK_UINT16(buffer, offset + 6)[0]
+                offset += 8
+            vr = vr.decode("ascii", "replace")
+        if length == _UNDEFINED_LENGTH:
+            return None
+        if tag in _SCAN_TAG_SET:
+            if offset + length > end:
+                return None
+            tag = Tag(tag)
+            elements[tag] = RawDataElement(
+                tag, vr, length, buffer[offset : offset + length], buffer_start + offset, is_implicit_vr, True
+            )
+            if tag in _HEADER_TAG_SET:
+                remaining -= 1
+                if not remaining:
+                    return elements
+        offset += length
+    return None
+
+
+def _past_header_tags(tag: Tag, vr: str, length: int) -> bool:
+    """Stop the element generator once it is past the last indexing tag."""
+    return tag > _LAST_HEADER_TAG
+
+
+def _read_entry(file_path: str) -> tuple | None:
+    """Read the index entry of a file, in a reader thread.
+
+    Besides the indexing tags, the CT referenced by a RTSTRUCT is read here, so a broken RTSTRUCT is skipped like
+    any other broken file.
+
+    :param str file_path: dicom filepath
+    :return tuple | None: PatientID, Modality, SOPInstanceUID, SeriesInstanceUID, InstanceNumber and the referenced
+        CT SeriesInstanceUID (None if not a RTSTRUCT), None if the file is skipped
+    """
+    dcm_header = _quick_tags(file_path)
+    if dcm_header is None:
+        return None
+    values = _header_values(dcm_header)
+    referenced_ct_uid = None
+    if values[0] == "RTSTRUCT":
+        try:
+            referenced_ct_uid = RTStruct(file_path).get_referenced_ct_uid()
+        except Exception as e:
+            logger.warning(f"Skipping {file_path}, failed to read the referenced CT: {e}")
+            return None
+    return sys.intern(str(dcm_header[0x10, 0x20].value)), *values, referenced_ct_uid
+
+
+def _header_values(dcm_header: pydicom.Dataset) -> tuple:
+    """Get the indexing values of a DICOM header.
+
+    :param pydicom.Dataset dcm_header: DICOM header
+    :return tuple: Modality, SOPInstanceUID, SeriesInstanceUID and InstanceNumber (0 if not present)
+    """
+    values = []
+    for tag in ((0x8, 0x60), (0x8, 0x18), (0x20, 0xE)):
+        element = dcm_header.get(tag)
+        values.append(None if element is None or element.value is None else sys.intern(str(element.value)))
+    instance_number = dcm_header.get((0x20, 0x13))
+    values.append(0 if instance_number is None or instance_number.value is None else int(instance_number.value))
+    return tuple(values)
 
 
 class DicomDatabase:
@@ -22,21 +305,85 @@ class DicomDatabase:
 
     def __init__(self):
         """DicomDatabase: Abstractions for handling DICOM data."""
-        self.patient = dict()
+        self.patient = defaultdict(Patient)
+        # filepath -> (mtime_ns, size, PatientID, Modality, SOPInstanceUID, SeriesInstanceUID, InstanceNumber,
+        # referenced CT SeriesInstanceUID), the index that is persisted with save_cache.
+        self._file_index = {}
 
-    def parse_folder(self, folder_path: str):
+    def parse_folder(self, folder_path: str, max_workers: int = None):
         """Read metadata of DICOM files form the sorce folder.
 
+        The headers are read in a thread pool, the database itself is only updated from the calling thread.
+        Files that are not DICOM (no "DICM" magic) or that are broken are skipped. Files that are in the index
+        loaded with load_cache, with unchanged modification time and size, are not read again.
+
         :param str folder_path: the source folder
+        :param int max_workers: Number of reader threads, defaults to min(32, 4 * CPU count)
+        """
+        max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        # Bound the number of headers in flight, so huge folders do not pile up in memory.
+        max_in_flight = max_workers * 4
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for file_path in _iter_dcm(folder_path):
+                file_stat = os.stat(file_path)
+                cached = self._file_index.get(file_path)
+                if cached and cached[0] == file_stat.st_mtime_ns and cached[1] == file_stat.st_size:
+                    patient_id, *values, referenced_ct_uid = cached[2:]
+                    self.patient[patient_id].add_entry(file_path, *values, referenced_ct_uid=referenced_ct_uid)
+                    continue
+                pending.append((file_path, file_stat, executor.submit(_read_entry, file_path)))
+                if len(pending) >= max_in_flight:
+                    self._add_file(*pending.popleft())
+            while pending:
+                self._add_file(*pending.popleft())
+
+    def _add_file(self, file_path: str, file_stat: os.stat_result, future):
+        """Add a file to the database and the file index once its entry is read.
+
+        :param str file_path: dicom filepath
+        :param os.stat_result file_stat: The stat of the file
+        :param concurrent.futures.Future future: The future of _read_entry
+        """
+        entry = future.result()
+        if entry is None:
+            return
+        patient_id, *values, referenced_ct_uid = entry
+        self.patient[patient_id].add_entry(file_path, *values, referenced_ct_uid=referenced_ct_uid)
+        self._file_index[file_path] = (file_stat.st_mtime_ns, file_stat.st_size, *entry)
+
+    def load_cache(self, cache_path: str):
+        """Load a file index saved with save_cache, parse_folder will not read the cached files again.
+
+        Nothing is loaded if the cache file does not exist yet.
+
+        :param str cache_path: SQLite file of the index
+        """
+        if not os.path.isfile(cache_path):
+            return
+        with closing(sqlite3.connect(cache_path)) as connection:
+            rows = connection.execute(
+                "SELECT file_path, mtime_ns, size, patient_id, modality, sop_instance_uid, series_instance_uid, "
+                "instance_number, referenced_ct_uid FROM files"
+            )
+            for file_path, *record in rows:
+                self._file_index[file_path] = tuple(sys.intern(v) if isinstance(v, str) else v for v in record)
+
+    def save_cache(self, cache_path: str):
+        """Save the file index of the parsed folders, existing entries of the same files are replaced.
+
+        :param str cache_path: SQLite file of the index
         """
-        for root, _, files in os.walk(folder_path):
-            for filename in files:
-                file_path = os.path.join(root, filename)
-                if file_path.endswith(".dcm") or file_path.endswith(".DCM"):
-                    dcm_header = pydicom.dcmread(file_path)
-                    patient_id = dcm_header[0x10, 0x20].value
-                    patient = self.get_or_create_patient(patient_id)
-                    patient.add_file(file_path, dcm_header)
+        with closing(sqlite3.connect(cache_path)) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (file_path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, "
+                "patient_id TEXT, modality TEXT, sop_instance_uid TEXT, series_instance_uid TEXT, "
+                "instance_number INTEGER, referenced_ct_uid TEXT)"
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((file_path, *record) for file_path, record in self._file_index.items()),
+            )
 
     def get_or_create_patient(self, patient_id: str) -> "Patient":
         """Get or create a Patient object.
@@ -44,8 +391,6 @@ class DicomDatabase:
         :param str patient_id: Patient ID
         :return Patient: The patient object
         """
-        if patient_id not in self.patient:
-            self.patient[patient_id] = Patient()
         return self.patient[patient_id]
 
     def count_patients(self):
@@ -56,8 +401,11 @@ class DicomDatabase:
         """Get the patient object given Patient ID.
 
         :param str patient_id: Patient ID
+        :raises KeyError: If the patient is not in the Database
         :return Patient: The patient object
         """
+        if patient_id not in self.patient:
+            raise KeyError(patient_id)
         return self.patient[patient_id]
 
     def get_patient_ids(self):
@@ -76,10 +424,14 @@ class DicomDatabase:
 class Patient:
     """The Patient Class."""
 
+    __slots__ = ("ct", "rtstruct", "_rt_to_ct")
+
     def __init__(self):
         """Create the Patient object."""
-        self.ct = dict()
-        self.rtstruct = dict()
+        self.ct = defaultdict(CT)
+        self.rtstruct = {}
+        # SOPInstanceUID of RTSTRUCT -> SeriesInstanceUID of the referenced CT, resolved once in add_entry.
+        self._rt_to_ct = {}
 
     def add_file(self, file_path: str, dcm_header: pydicom.Dataset):
         """Add a DICOM file to this Patient.
@@ -87,17 +439,35 @@ class Patient:
         :param str file_path: dicom filepath
         :param pydicom.Dataset dcm_header: DICOM header
         """
-        modality = dcm_header[0x8, 0x60].value
-        sop_instance_uid = dcm_header[0x8, 0x18].value
-        series_instance_uid = dcm_header[0x20, 0xE].value
-        if (modality == "CT") or (modality == "PT") or (modality == "MR"):
-            if series_instance_uid not in self.ct:
-                self.ct[series_instance_uid] = CT()
-            my_ct = self.ct[series_instance_uid]
-            my_ct.add_ct_slice(file_path)
-        if modality == "RTSTRUCT":
-            struct = RTStruct(file_path)
+        self.add_entry(file_path, *_header_values(dcm_header))
+
+    def add_entry(
+        self,
+        file_path: str,
+        modality: str,
+        sop_instance_uid: str,
+        series_instance_uid: str,
+        instance_number: int = 0,
+        referenced_ct_uid: str = _UNRESOLVED,
+    ):
+        """Add a DICOM file to this Patient, given its already read indexing values.
+
+        :param str file_path: dicom filepath
+        :param str modality: Modality
+        :param str sop_instance_uid: SOPInstanceUID
+        :param str series_instance_uid: SeriesInstanceUID
+        :param int instance_number: InstanceNumber, defaults to 0
+        :param str referenced_ct_uid: SeriesInstanceUID of the CT referenced by a RTSTRUCT,
+        read from the file if not given
+        """
+        if modality in _IMAGE_MODALITIES:
+            self.ct[series_instance_uid].add_ct_slice(file_path, instance_number)
+        elif modality == "RTSTRUCT":
+            struct = RTStruct(file_path, sop_instance_uid)
+            if referenced_ct_uid is not _UNRESOLVED:
+                struct._ref_ct_uid = referenced_ct_uid
             self.rtstruct[sop_instance_uid] = struct
+            self._rt_to_ct[sop_instance_uid] = struct.get_referenced_ct_uid()
 
     def count_ct_scans(self):
         """Count CT Scans in this patient."""
@@ -156,36 +526,51 @@ class Patient:
         :param RTStruct rtstruct: The RTStruct object
         :return CT: The related CT Object
         """
-        if rtstruct.get_referenced_ct_uid() is not None:
-            return self.get_ct_scan(rtstruct.get_referenced_ct_uid())
-        else:
-            return None
+        if rtstruct.sop_instance_uid in self._rt_to_ct:
+            return self.get_ct_scan(self._rt_to_ct[rtstruct.sop_instance_uid])
+        return self.get_ct_scan(rtstruct.get_referenced_ct_uid())
 
 
 class CT:
     """The CT Class."""
 
+    __slots__ = ("_slices", "_sorted")
+
     def __init__(self):
         """Creates the CT object."""
-        self.file_path = list()
+        # (InstanceNumber, filepath), sorted on the first read after a change, independent of the folder traversal.
+        self._slices = []
+        self._sorted = True
 
-    def add_ct_slice(self, file_path: str):
+    def add_ct_slice(self, file_path: str, instance_number: int = 0):
         """Add a CT slice to this object.
 
         :param str file_path: CT slice path
+        :param int instance_number: InstanceNumber of the slice, defaults to 0
         """
-        self.file_path.append(file_path)
+        self._slices.append((instance_number, file_path))
+        self._sorted = False
+
+    def _ordered_slices(self) -> list:
+        """Get the (InstanceNumber, filepath) pairs, sorting them once after slices were added.
+
+        :return list: The pairs, ordered by InstanceNumber.
+        """
+        if not self._sorted:
+            self._slices.sort()
+            self._sorted = True
+        return self._slices
 
     def get_slices(self) -> list:
-        """Get the CT Slice filepaths.
+        """Get the CT Slice filepaths, ordered by InstanceNumber.
 
         :return list:List of CT slice paths.
         """
-        return self.file_path
+        return [file_path for _, file_path in self._ordered_slices()]
 
     def get_slice_count(self):
         """Get CT Slice Count."""
-        return len(self.file_path)
+        return len(self._slices)
 
     def get_slice_header(self, index: int) -> pydicom.Dataset:
         """Get the pydicom header of the n-th Ct slice.
@@ -193,40 +578,63 @@ class CT:
         :param int index: Index of the CT Slice
         :param pydicom.Dataset dcm_header: DICOM header
         """
-        return pydicom.dcmread(self.file_path[index])
+        return pydicom.dcmread(self._ordered_slices()[index][1])
 
 
 class RTStruct:
     """The  RTStruct Class."""
 
-    def __init__(self, file_path: str):
+    __slots__ = ("file_path", "sop_instance_uid", "_header", "_ref_ct_uid")
+
+    def __init__(self, file_path: str, sop_instance_uid: str = None):
         """Creates the RTStruct object.
 
         :param str file_path: RTSTRUCT path
+        :param str sop_instance_uid: SOPInstanceUID of the RTSTRUCT, defaults to None
         """
         self.file_path = file_path
+        self.sop_instance_uid = sop_instance_uid
+        self._header = None
+        self._ref_ct_uid = _UNRESOLVED
 
     def get_header(self) -> pydicom.FileDataset:
-        """Get the dicom header.
+        """Get the dicom header, it is read once and cached.
 
         :return pydicom.FileDataset: DICOM header
         """
-        return pydicom.dcmread(self.file_path)
+        if self._header is None:
+            self._header = pydicom.dcmread(self.file_path, stop_before_pixels=True)
+        return self._header
 
     def get_referenced_ct_uid(self) -> str:
         """Get the SeriesInstanceUID of referenecd CT.
 
         :return str: SeriesInstanceUID
         """
-        dcm_header = self.get_header()
-        if len(list(dcm_header[0x3006, 0x10])) > 0:
-            ref_frame_of_ref = (dcm_header[0x3006, 0x10])[0]
-            if len(list(ref_frame_of_ref[0x3006, 0x0012])) > 0:
-                rt_ref_study = (ref_frame_of_ref[0x3006, 0x0012])[0]
-                if len(list(rt_ref_study[0x3006, 0x14])) > 0:
-                    rt_ref_serie = (rt_ref_study[0x3006, 0x14])[0]
-                    return rt_ref_serie[0x20, 0xE].value
-        return None
+        if self._ref_ct_uid is _UNRESOLVED:
+            self._ref_ct_uid = self._read_referenced_ct_uid()
+        return self._ref_ct_uid
+
+    def _read_referenced_ct_uid(self) -> str:
+        """Read the SeriesInstanceUID of referenecd CT from the file.
+
+        :return str: SeriesInstanceUID
+        """
+        if self._header is not None:
+            dcm_header = self._header
+        else:
+            dcm_header = pydicom.dcmread(self.file_path, specific_tags=_RTSTRUCT_REFERENCE_TAGS)
+        # ReferencedFrameOfReferenceSequence > RTReferencedStudySequence > RTReferencedSeriesSequence
+        item = dcm_header
+        for sequence_tag in ((0x3006, 0x10), (0x3006, 0x12), (0x3006, 0x14)):
+            sequence = item.get(sequence_tag)
+            if sequence is None or not sequence.value:
+                return None
+            item = sequence.value[0]
+        series_instance_uid = item.get((0x20, 0xE))
+        if series_instance_uid is None:
+            return None
+        return sys.intern(str(series_instance_uid.value))
 
     def get_file_location(self) -> str:
         """Get the RTSTRUCT filepath.
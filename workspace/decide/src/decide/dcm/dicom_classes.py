@@ -21,17 +21,20 @@ class Patient:
         :param str modality: DICOMModality
         :return List: List of the specified modality objects with their metadata
         """
+        series_class = _MODALITY_CLASSES.get(modality, Series)
         results = []
+        results_append = results.append
         for studyuid, study_data in self.data.get("Studies", {}).items():
+            matches = [
+                (seriesuid, series_data)
+                for seriesuid, series_data in study_data.get("Series", {}).items()
+                if series_data.get("Modality") == modality
+            ]
+            if not matches:
+                continue
             study = Study(study_data, studyuid, self)
-            for seriesuid, series_data in study_data.get("Series", {}).items():
-                if series_data.get("Modality") == modality:
-                    if modality == "CT":
-                        results.append(CT(series_data, seriesuid, study))
-                    elif modality == "RTSTRUCT":
-                        results.append(RTSTRUCT(series_data, seriesuid, study))
-                    else:
-                        results.append(Series(series_data, seriesuid, study))
+            for seriesuid, series_data in matches:
+                results_append(series_class(series_data, seriesuid, study))
         return results
 
 
@@ -68,10 +71,11 @@ class Series:
 
     def get_files(self) -> List[str]:
         """Return the Files in this series."""
-        files = []
-        for _, instance_data in self.data.get("Instances", {}).items():
-            files.append(instance_data.get("FilePath", {}))
-        return files
+        return [
+            instance_data["FilePath"]
+            for instance_data in self.data.get("Instances", {}).values()
+            if "FilePath" in instance_data
+        ]
 
 
 class CT(Series):
@@ -115,7 +119,11 @@ class RTSTRUCT(Series):
     def get_ct(self):
         """Find the CT series referenced by this RTSTRUCT."""
         ref_uid = self.data.get("ReferencedSeriesUID")
-        for uid, series in self.study.data.get("Series", {}).items():
-            if uid == ref_uid and series.get("Modality") == "CT":
-                return CT(series, uid)
+        series = self.study.data.get("Series", {}).get(ref_uid)
+        if series and series.get("Modality") == "CT":
+            return CT(series, ref_uid, self.study)
         return None
+
+
+# Series classes with modality specific tools, the other modalities are a plain Series.
+_MODALITY_CLASSES = {"CT": CT, "RTSTRUCT": RTSTRUCT}
@@ -1,11 +1,20 @@
 """."""
 
 import json
+import multiprocessing
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from operator import itemgetter
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import pydicom
 import yaml
+from pydicom.datadict import tag_for_keyword
+from pydicom.tag import BaseTag
 from tqdm import tqdm
 
 from decide.dcm.dicom_classes import Patient
@@ -13,6 +22,213 @@ from decide.dcm.dicom_metadata import DICOMNestedTags
 from decide.paths import CONFIG_DIR
 from decide.utils.logger import setup_logger
 
+try:
+    import orjson
+except ImportError:  # optional, see the "fast" extra
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, see the "fast" extra
+    msgpack = None
+
+_DB_SUFFIXES = (".json", ".msgpack", ".pkl")
+
+_PROCESS_CHUNKSIZE = 64
+# Callers may run DICOMData from several threads, and forking a multithreaded process can leave a lock held
+# in the child, so the workers are started from a fork server where the platform has one.
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+)
+_GROUP_KEY = itemgetter("PatientID", "StudyInstanceUID", "SeriesInstanceUID")
+_BASE_TAGS = ("PatientID", "StudyInstanceUID", "SeriesInstanceUID", "SOPInstanceUID", "Modality")
+_CALLABLE_REGISTRY = {
+    name: getattr(DICOMNestedTags, name)
+    for name in dir(DICOMNestedTags)
+    if not name.startswith("_") and callable(getattr(DICOMNestedTags, name))
+}
+
+
+class _CustomLoader(yaml.SafeLoader):
+    """SafeLoader resolving ``!callable`` scalars to ``DICOMNestedTags`` methods."""
+
+
+def _resolve_callable(loader: yaml.SafeLoader, node: yaml.Node) -> Optional[Callable]:
+    return _CALLABLE_REGISTRY.get(loader.construct_scalar(node))
+
+
+_CustomLoader.add_constructor("!callable", _resolve_callable)
+
+
+def _scandir_walk(root: Union[str, Path]) -> Iterator[str]:
+    """Yield the paths of all files below ``root``.
+
+    :param Union[str, Path] root: Directory to walk.
+    :return Iterator[str]: File paths, using the cached ``DirEntry`` type instead of a stat per entry.
+    """
+    pending = deque([os.fspath(root)])
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+
+
+def _specific_tags(
+    additional_tags: Optional[Dict[str, List[str]]] = None,
+    modality_specific: Optional[
+        Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]]
+    ] = None,
+) -> Optional[List[str]]:
+    """Collect the keywords that need to be parsed for the given configuration.
+
+    :param Optional[Dict[str, List[str]]] additional_tags: Additional metadata tags, defaults to None
+    :param Optional[ Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]] ]
+    modality_specific: Modality specific metadata tags, defaults to None
+    :return Optional[List[str]]: Keywords to pass as ``specific_tags``, or None if a callable with unknown
+    requirements needs the full dataset. Keywords unknown to the DICOM dictionary are left out, dcmread rejects
+    them, and read as "Unknown".
+    """
+    keywords = set(_BASE_TAGS)
+    for tag_list in (additional_tags or {}).values():
+        keywords.update(tag_list)
+    for levels in (modality_specific or {}).values():
+        for tag_list in levels.values():
+            for tag in tag_list:
+                if isinstance(tag, str):
+                    keywords.add(tag)
+                elif callable(tag):
+                    required = DICOMNestedTags.REQUIRED_TAGS.get(getattr(tag, "__name__", ""))
+                    if required is None:
+                        return None
+                    keywords.update(required)
+    return sorted(keyword for keyword in keywords if tag_for_keyword(keyword) is not None)
+
+
+def _tag_table(
+    additional_tags: Optional[Dict[str, List[str]]] = None,
+    modality_specific: Optional[
+        Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]]
+    ] = None,
+) -> Dict[str, BaseTag]:
+    """Translate the base and configured keywords to tags once, for ``_tag_value``.
+
+    :param Optional[Dict[str, List[str]]] additional_tags: Additional metadata tags, defaults to None
+    :param Optional[ Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]] ]
+    modality_specific: Modality specific metadata tags, defaults to None
+    :return Dict[str, BaseTag]: Keyword to tag, for keywords known to the DICOM dictionary.
+    """
+    keywords = set(_BASE_TAGS)
+    for tag_list in (additional_tags or {}).values():
+        keywords.update(tag_list)
+    for levels in (modality_specific or {}).values():
+        for tag_list in levels.values():
+            keywords.update(tag for tag in tag_list if isinstance(tag, str))
+    table = {keyword: tag_for_keyword(keyword) for keyword in keywords}
+    return {keyword: BaseTag(tag) for keyword, tag in table.items() if tag is not None}
+
+
+def _tag_value(dicom: pydicom.Dataset, keyword: str, tag_table: Optional[Dict[str, BaseTag]]) -> str:
+    """Return a tag value as string, looked up by tag to skip the keyword translation in ``__getattr__``.
+
+    :param pydicom.Dataset dicom: DICOM header
+    :param str keyword: DICOM keyword
+    :param Optional[Dict[str, BaseTag]] tag_table: Precomputed keyword to tag table, see ``_tag_table``
+    :return str: The value, or "Unknown" if missing.
+    """
+    tag = tag_table.get(keyword) if tag_table else None
+    if tag is None:
+        return str(getattr(dicom, keyword, "Unknown"))
+    element = dicom.get(tag)
+    return "Unknown" if element is None else str(element.value)
+
+
+def _is_dicom(file_path: Union[str, Path]) -> bool:
+    """Check for the "DICM" magic after the 128 byte preamble.
+
+    :param Union[str, Path] file_path: File
+    :return bool: True if the file has a DICOM Part 10 header.
+    """
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        return os.read(fd, 132)[128:132] == b"DICM"
+    finally:
+        os.close(fd)
+
+
+def _process_dicom_file(
+    file_path: Union[str, Path],
+    modalities: Optional[List[str]] = None,
+    additional_tags: Optional[Dict[str, List[str]]] = None,
+    modality_specific: Optional[
+        Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]]
+    ] = None,
+    specific_tags: Optional[List[str]] = None,
+    tag_table: Optional[Dict[str, BaseTag]] = None,
+) -> Optional[Dict]:
+    """Processes a single DICOM file and extracts relevant metadata.
+
+    Kept at module level so it can be dispatched to worker processes; the ``!callable`` tags are
+    ``DICOMNestedTags`` staticmethods, which pickle by reference.
+
+    :param Union[str, Path] file_path: File
+    :param Optional[List[str]] modalities: Modalities to consider, defaults to None
+    :param Optional[Dict[str, List[str]]] additional_tags: Additional metadata tags, defaults to None
+    :param Optional[ Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]] ]
+    modality_specific: Modality specific metadata tags, defaults to None
+    :param Optional[List[str]] specific_tags: Only parse these keywords, defaults to None (full header)
+    :param Optional[Dict[str, BaseTag]] tag_table: Precomputed keyword to tag table, defaults to None
+    :return Optional[Dict]: Interested metadata of a DICOM File.
+    """
+    if not _is_dicom(file_path):
+        return None
+    try:
+        dicom = pydicom.dcmread(file_path, stop_before_pixels=True, force=True, specific_tags=specific_tags)
+        patient_id = _tag_value(dicom, "PatientID", tag_table)
+        study_uid = _tag_value(dicom, "StudyInstanceUID", tag_table)
+        series_uid = _tag_value(dicom, "SeriesInstanceUID", tag_table)
+        instance_uid = _tag_value(dicom, "SOPInstanceUID", tag_table)
+        modality = _tag_value(dicom, "Modality", tag_table)
+        if modalities and modality not in modalities:
+            return None
+        file_data = {
+            "PatientID": patient_id,
+            "StudyInstanceUID": study_uid,
+            "SeriesInstanceUID": series_uid,
+            "SOPInstanceUID": instance_uid,
+            "Series": {"Modality": modality},
+            "Instances": {"FilePath": str(file_path)},
+            "Patients": {},
+            "Studies": {},
+        }
+        if additional_tags:
+            for tag_level, tag_list in additional_tags.items():
+                for tag in tag_list:
+                    file_data[tag_level][tag] = _tag_value(dicom, tag, tag_table)
+        if modality_specific and modality in modality_specific:
+            for tag_level, tag_list in modality_specific[modality].items():
+                for tag in tag_list:
+                    try:
+                        if callable(tag):
+                            tag_name, tag_value = tag(dicom)
+                            file_data[tag_level][tag_name] = str(tag_value)
+                        elif isinstance(tag, str):
+                            file_data[tag_level][tag] = _tag_value(dicom, tag, tag_table)
+                    except Exception:
+                        continue
+        return file_data
+    except Exception:
+        return None
+
 
 class DICOMData:
     """Manages and organizes DICOM data from directories or JSON files."""
@@ -22,17 +238,21 @@ class DICOMData:
         input_source: Union[Path, str, List],
         configuration: Optional[Union[Path, str]] = CONFIG_DIR / "dicomdata_config.yaml",
         logger=None,
+        *,
+        max_workers: Optional[int] = None,
     ):
         """Initializes the DICOMData object with input source and optional configuration.
 
-        :param Union[Path, str, List] input_source: The directory with dicom files or list of files or json file made
-        with this class.
+        :param Union[Path, str, List] input_source: The directory with dicom files or list of files or a .json
+        (.msgpack, .pkl) file made with this class.
         :param Optional[Union[Path, str]] configuration: Configuration for metadata,
         defaults to CONFIG_DIR/"dicomdata_config.yaml"
         :param _type_ logger: The Optional Logger Object, defaults to None
+        :param Optional[int] max_workers: Number of worker processes reading a directory, defaults to os.cpu_count()
         :raises ValueError: For invalida JSON or YAML files.
         """
         self.source_file = ""
+        self.max_workers = max_workers
         self.logger = logger if logger else setup_logger(name="DICOM DataBase")
         self.data = {}
 
@@ -54,7 +274,7 @@ class DICOMData:
                 self.logger.info(f"DB Object initializing from Directory : {input_source}")
                 self.source_dir = input_source
                 self.load_from_directory()
-            elif input_source.is_file() and input_source.suffix.lower() == ".json":
+            elif input_source.is_file() and input_source.suffix.lower() in _DB_SUFFIXES:
                 self.logger.info(f"DB Object initializing from File : {input_source}")
                 self.source_file = input_source
                 self.load_from_file()
@@ -75,28 +295,26 @@ class DICOMData:
 
     def load_configuration_from_yaml(self, configuration):
         """Parses YAML configuration with custom callable resolution."""
-
-        def get_static_method_from_class(class_obj, method_name):
-            if hasattr(class_obj, method_name):
-                attr = getattr(class_obj, method_name)
-                if callable(attr):
-                    return attr
-            return None
-
-        class CustomLoader(yaml.SafeLoader):
-            pass
-
-        def resolve_callable(loader, node):
-            name = loader.construct_scalar(node)
-            return get_static_method_from_class(DICOMNestedTags, name)
-
-        CustomLoader.add_constructor("!callable", resolve_callable)
-
         with open(configuration, "r") as file:
-            self.config = yaml.load(file, Loader=CustomLoader)
+            self.config = yaml.load(file, Loader=_CustomLoader)
 
     def load_from_file(self):
-        """Loads DICOM metadata from a JSON file."""
+        """Loads DICOM metadata from a JSON file, or a .msgpack/.pkl file written by ``save_db``.
+
+        Only load .pkl files you created yourself; unpickling runs arbitrary code.
+        """
+        suffix = Path(self.source_file).suffix.lower()
+        if suffix == ".msgpack":
+            if msgpack is None:
+                raise ValueError("Reading .msgpack files requires the msgpack package.")
+            self.data = msgpack.unpackb(Path(self.source_file).read_bytes(), raw=False)
+            return
+        if suffix == ".pkl":
+            self.data = pickle.loads(Path(self.source_file).read_bytes())
+            return
+        if orjson is not None:
+            self.data = orjson.loads(Path(self.source_file).read_bytes())
+            return
         with open(self.source_file, "r", encoding="utf-8") as json_file:
             self.data = json.load(json_file)
 
@@ -120,10 +338,25 @@ class DICOMData:
         )
 
     def save_db(self, output_json):
-        """Saves organized DICOM metadata to a JSON file."""
+        """Saves organized DICOM metadata to a JSON file.
+
+        Uses orjson when installed; otherwise ``json.dump`` streams the encoded chunks to the file. A .msgpack or .pkl
+        suffix stores the same data in a binary format that loads several times faster.
+        """
         if output_json:
-            with open(output_json, "w", encoding="utf-8") as json_file:
-                json.dump(self.data, json_file, indent=4)
+            suffix = Path(output_json).suffix.lower()
+            if suffix == ".msgpack":
+                if msgpack is None:
+                    raise ValueError("Writing .msgpack files requires the msgpack package.")
+                Path(output_json).write_bytes(msgpack.packb(self.data, use_bin_type=True))
+            elif suffix == ".pkl":
+                Path(output_json).write_bytes(pickle.dumps(self.data, protocol=5))
+            elif orjson is not None:
+                Path(output_json).write_bytes(orjson.dumps(self.data, option=orjson.OPT_INDENT_2))
+            else:
+                # Same layout as orjson's OPT_INDENT_2, so the file does not depend on which one is installed
+                with open(output_json, "w", encoding="utf-8") as json_file:
+                    json.dump(self.data, json_file, indent=2, ensure_ascii=False)
             if not self.source_file:
                 self.source_file = output_json
 
@@ -149,67 +382,93 @@ class DICOMData:
         dicom_files = self.collect_files(input_dir)
         if not dicom_files:
             raise ValueError(f"No files found in the directory: {input_dir}")
-        organized_data = self.collect_metadata(dicom_files, modalities, additional_tags, modality_specific)
+        organized_data = self.collect_metadata(
+            dicom_files, modalities, additional_tags, modality_specific, max_workers=self.max_workers
+        )
         organized_data["DirectoryPath"] = (
             str(input_dir) if isinstance(input_dir, (Path, str)) else [str(i) for i in input_dir]
         )
         return organized_data
 
-    def collect_files(self, input_dir: Union[Path, str, List[str]]) -> List[Path]:
+    def collect_files(self, input_dir: Union[Path, str, List[str]]) -> List[str]:
         """Collects all file paths from the input directory or list of directories.
 
         :param Union[Path, str, List[str]] input_dir: DICOM Directory
         :raises ValueError: If directory does not exist.
-        :return List[Path]: List of all files.
+        :return List[str]: List of all files.
         """
         if isinstance(input_dir, list):
             dicom_files = []
             for dir_ in tqdm(input_dir, desc="Collecting Files"):
-                dicom_files += [file_path for file_path in Path(dir_).rglob("*") if file_path.is_file()]
+                dicom_files.extend(_scandir_walk(dir_))
         else:
             input_dir = Path(input_dir)
             if not input_dir.exists() or not input_dir.is_dir():
                 raise ValueError(f"Invalid input directory: {input_dir}")
             if not input_dir.is_absolute():
                 input_dir = input_dir.resolve()
-            dicom_files = [file for file in input_dir.rglob("*") if file.is_file()]
+            dicom_files = list(_scandir_walk(input_dir))
         return dicom_files
 
     def collect_metadata(
         self,
-        dicom_files: List[Path],
+        dicom_files: List[Union[str, Path]],
         modalities: Optional[List[str]] = None,
         additional_tags: Optional[Dict[str, List[str]]] = None,
         modality_specific: Optional[
             Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]]
         ] = None,
+        max_workers: Optional[int] = None,
     ) -> Dict:
         """Processes DICOM files and organizes metadata hierarchically.
 
-        :param List[Path] dicom_files: List of files.
+        The files are parsed in a process pool; the results are merged into the hierarchy in this process.
+
+        :param List[Union[str, Path]] dicom_files: List of files.
         :param Optional[List[str]] modalities: Modalities to consider, defaults to None
         :param Optional[Dict[str, List[str]]] additional_tags: Additional metadata tags needed, defaults to None
         :param Optional[ Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]] ]
         modality_specific: MOdality specific metadata tags, defaults to None
+        :param Optional[int] max_workers: Number of worker processes, defaults to os.cpu_count()
         :raises ValueError: If nothing to output.
         :return Dict: Organized DICOM Metadata
         """
         organized_data = {"Patients": {}}
-        for f in tqdm(dicom_files, desc="Processing DICOM files"):
-            result = self.process_dicom_file(f, modalities, additional_tags, modality_specific)
-            if not result:
-                continue
-            patient_data = organized_data["Patients"].setdefault(result["PatientID"], {})
-            patient_data.update(result["Patients"])
-            studies = patient_data.setdefault("Studies", {})
-            study_data = studies.setdefault(result["StudyInstanceUID"], {})
-            study_data.update(result["Studies"])
-            series = study_data.setdefault("Series", {})
-            series_data = series.setdefault(result["SeriesInstanceUID"], {})
-            series_data.update(result["Series"])
-            instances = series_data.setdefault("Instances", {})
-            instance_data = instances.setdefault(result["SOPInstanceUID"], {})
-            instance_data.update(result["Instances"])
+        process = partial(
+            _process_dicom_file,
+            modalities=modalities,
+            additional_tags=additional_tags,
+            modality_specific=modality_specific,
+            specific_tags=_specific_tags(additional_tags, modality_specific),
+            tag_table=_tag_table(additional_tags, modality_specific),
+        )
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=_MP_CONTEXT) as executor:
+            results = executor.map(process, dicom_files, chunksize=_PROCESS_CHUNKSIZE)
+            results = tqdm(results, total=len(dicom_files), desc="Processing DICOM files")
+            results = [result for result in results if result]
+
+        # The sort is stable, so later files still override earlier ones within a group; a sub-dict is only
+        # opened when the patient, study or series changes.
+        results.sort(key=_GROUP_KEY)
+        patients = organized_data["Patients"]
+        patient_id = study_uid = series_uid = None
+        for result in results:
+            if result["PatientID"] != patient_id:
+                patient_id, study_uid = result["PatientID"], None
+                patient_data = patients[patient_id] = {**result["Patients"], "Studies": {}}
+            else:
+                patient_data.update(result["Patients"])
+            if result["StudyInstanceUID"] != study_uid:
+                study_uid, series_uid = result["StudyInstanceUID"], None
+                study_data = patient_data["Studies"][study_uid] = {**result["Studies"], "Series": {}}
+            else:
+                study_data.update(result["Studies"])
+            if result["SeriesInstanceUID"] != series_uid:
+                series_uid = result["SeriesInstanceUID"]
+                series_data = study_data["Series"][series_uid] = {**result["Series"], "Instances": {}}
+            else:
+                series_data.update(result["Series"])
+            series_data["Instances"].setdefault(result["SOPInstanceUID"], {}).update(result["Instances"])
         if not organized_data:
             raise ValueError("No valid DICOM files found!")
         return organized_data
@@ -222,6 +481,7 @@ class DICOMData:
         modality_specific: Optional[
             Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]]
         ] = None,
+        specific_tags: Optional[List[str]] = None,
     ) -> Optional[Dict]:
         """Processes a single DICOM file and extracts relevant metadata.
 
@@ -230,45 +490,10 @@ class DICOMData:
         :param Optional[Dict[str, List[str]]] additional_tags: Additional metadata tags, defaults to None
         :param Optional[ Dict[str, Dict[str, List[Union[str, Callable[[pydicom.FileDataset], Tuple[str, str]]]]]] ]
         modality_specific: Modality specific metadata tags, defaults to None
+        :param Optional[List[str]] specific_tags: Only parse these keywords, defaults to None (full header)
         :return Optional[Dict]: Interested metadata of a DICOM File.
         """
-        try:
-            dicom = pydicom.dcmread(file_path, stop_before_pixels=True, force=True)
-            patient_id = str(getattr(dicom, "PatientID", "Unknown"))
-            study_uid = str(getattr(dicom, "StudyInstanceUID", "Unknown"))
-            series_uid = str(getattr(dicom, "SeriesInstanceUID", "Unknown"))
-            instance_uid = str(getattr(dicom, "SOPInstanceUID", "Unknown"))
-            modality = str(getattr(dicom, "Modality", "Unknown"))
-            if modalities and modality not in modalities:
-                return None
-            file_data = {
-                "PatientID": patient_id,
-                "StudyInstanceUID": study_uid,
-                "SeriesInstanceUID": series_uid,
-                "SOPInstanceUID": instance_uid,
-                "Series": {"Modality": modality},
-                "Instances": {"FilePath": str(file_path)},
-                "Patients": {},
-                "Studies": {},
-            }
-            if additional_tags:
-                for tag_level, tag_list in additional_tags.items():
-                    for tag in tag_list:
-                        file_data[tag_level][tag] = str(getattr(dicom, tag, "Unknown"))
-            if modality_specific and modality in modality_specific:
-                for tag_level, tag_list in modality_specific[modality].items():
-                    for tag in tag_list:
-                        try:
-                            if callable(tag):
-                                tag_name, tag_value = tag(dicom)
-                                file_data[tag_level][tag_name] = str(tag_value)
-                            elif isinstance(tag, str):
-                                file_data[tag_level][tag] = str(getattr(dicom, tag, "Unknown"))
-                        except Exception:
-                            continue
-            return file_data
-        except Exception:
-            return None
+        return _process_dicom_file(file_path, modalities, additional_tags, modality_specific, specific_tags)
 
     def list_patients(self):
         """Return a list of patient IDs."""
@@ -1,14 +1,82 @@
 """Image Conversion."""
 
 import logging
+import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
+import pydicom
 import SimpleITK as sitk
+from pydicom.tag import Tag
 
 from decide.utils.logger import setup_logger
 
+_INSTANCE_NUMBER_TAG = [Tag(0x0020, 0x0013)]
+
+
+def _read_instance_number(file_path: str) -> float:
+    """Read only the InstanceNumber of a DICOM file.
+
+    :param str file_path: DICOM file path.
+    :return float: Instance Number.
+    """
+    dicom_header = pydicom.dcmread(file_path, stop_before_pixels=True, specific_tags=_INSTANCE_NUMBER_TAG)
+    return float(dicom_header.InstanceNumber)
+
+
+def _read_slice(file_path: str) -> Tuple[pydicom.FileDataset, np.ndarray]:
+    """Read a DICOM slice and decode its pixel data.
+
+    :param str file_path: DICOM file path.
+    :return Tuple[pydicom.FileDataset, np.ndarray]: The header and the stored pixel values.
+    """
+    dicom = pydicom.dcmread(file_path)
+    return dicom, dicom.pixel_array
+
+
+def _stack_dicom_series(dicom_files: List[str]) -> sitk.Image:
+    """Build an image from sorted DICOM slices with one pydicom read per file.
+
+    Follows ``sitk.ImageSeriesReader``: the origin is the position of the first file, the slice spacing is the mean
+    distance between the first and last position, and the modality rescale is applied per slice (kept as the stored
+    type without rescale, int32 for integral rescales, float64 otherwise).
+
+    :param List[str] dicom_files: DICOM file paths, in slice order.
+    :return sitk.Image: The image.
+    """
+    with ThreadPoolExecutor() as executor:
+        slices = list(executor.map(_read_slice, dicom_files))
+    headers = [header for header, _ in slices]
+    volume = np.stack([pixels for _, pixels in slices])
+    del slices
+
+    slopes = np.array([float(getattr(header, "RescaleSlope", 1) or 1) for header in headers])
+    intercepts = np.array([float(getattr(header, "RescaleIntercept", 0) or 0) for header in headers])
+    if np.any(slopes != 1) or np.any(intercepts != 0):
+        integral = np.all(slopes == np.round(slopes)) and np.all(intercepts == np.round(intercepts))
+        volume = volume.astype(np.int32 if integral else np.float64)
+        volume *= slopes.astype(volume.dtype)[:, None, None]
+        volume += intercepts.astype(volume.dtype)[:, None, None]
+
+    first = np.asarray(headers[0].ImagePositionPatient, dtype=float)
+    orientation = np.asarray(headers[0].ImageOrientationPatient, dtype=float)
+    row, column = orientation[:3], orientation[3:]
+    if len(headers) > 1:
+        last = np.asarray(headers[-1].ImagePositionPatient, dtype=float)
+        slice_spacing = float(np.linalg.norm(last - first)) / (len(headers) - 1)
+    else:
+        slice_spacing = float(getattr(headers[0], "SliceThickness", 1) or 1)
+    pixel_spacing = headers[0].PixelSpacing
+
+    image = sitk.GetImageFromArray(volume)
+    image.SetOrigin(first.tolist())
+    image.SetSpacing((float(pixel_spacing[1]), float(pixel_spacing[0]), slice_spacing))
+    image.SetDirection(np.column_stack((row, column, np.cross(row, column))).ravel().tolist())
+    return image
+
 
 class ImageConvertor:
     """Contains static methods to convert DICOM image to NIfTI."""
@@ -23,7 +91,6 @@ class ImageConvertor:
         :return bool: True if conversion is successful, False otherwise.
         """
         logger = logger or setup_logger(level=logging.INFO)
-        logger.info("\n")
 
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -31,25 +98,55 @@ class ImageConvertor:
         command = ["plastimatch", "convert", "--input", str(dicom_dir), "--output-img", str(output_file)]
 
         try:
-            logger.info(f"Starting image conversion: {command}")
             result = subprocess.run(command, capture_output=True, text=True)
-
-            logger.info(f"stdout: {result.stdout}")
-            logger.info(f"stderr: {result.stderr}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"stdout: {result.stdout}")
+                logger.debug(f"stderr: {result.stderr}")
 
             if result.returncode != 0:
-                logger.error(f"Image conversion failed with return code {result.returncode}")
-                logger.info("\n\n")
+                logger.error(f"Image conversion failed with return code {result.returncode}: {result.stderr}")
                 return False
-            logger.info(f"Image conversion successful. Output saved to: {output_file}")
-            logger.info("\n\n")
+            logger.info(f"Image conversion successful. Output saved to: {output_file} ({command})")
             return True
 
         except Exception as e:
             logger.error(f"Exception during image conversion: {str(e)}")
-            logger.info("\n\n")
             return False
 
+    @staticmethod
+    def convert_batch(
+        jobs: List[Tuple[Union[str, Path], Union[str, Path]]],
+        max_workers: Optional[int] = None,
+        logger: logging.Logger = None,
+    ) -> List[bool]:
+        """Convert several DICOM image directories to NIfTI files with concurrent Plastimatch processes.
+
+        :param List[Tuple[Union[str, Path], Union[str, Path]]] jobs: (DICOM directory, output .nii.gz file) pairs.
+        :param Optional[int] max_workers: Concurrent conversions, defaults to min(os.cpu_count(), 8)
+        :param logging.Logger logger: Optional logger object, defaults to None
+        :return List[bool]: Success of each job, in the order of ``jobs``.
+        """
+        logger = logger or setup_logger(level=logging.INFO)
+
+        def convert(job: Tuple[Union[str, Path], Union[str, Path]]) -> bool:
+            dicom_dir, output_file = job
+            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+            command = ["plastimatch", "convert", "--input", str(dicom_dir), "--output-img", str(output_file)]
+            try:
+                with subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True) as process:
+                    _, stderr = process.communicate()
+            except Exception as e:
+                logger.error(f"Exception during image conversion of {dicom_dir}: {str(e)}")
+                return False
+            if process.returncode != 0:
+                logger.error(f"Image conversion of {dicom_dir} failed with return code {process.returncode}: {stderr}")
+                return False
+            logger.info(f"Image conversion successful. Output saved to: {output_file}")
+            return True
+
+        with ThreadPoolExecutor(max_workers=max_workers or min(os.cpu_count() or 1, 8)) as executor:
+            return list(executor.map(convert, jobs))
+
     @staticmethod
     def dcm_rtstruct_to_nifti_platimatch(
         rtstruct_file: str, referenced_ct: str, output_prefix: str, logger: logging.Logger = None
@@ -63,7 +160,6 @@ class ImageConvertor:
         :return bool: True if conversion is successful, False otherwise.
         """
         logger = logger or setup_logger(level=logging.INFO)
-        logger.info("\n")
 
         output_path = Path(output_prefix).parent
         output_path.mkdir(parents=True, exist_ok=True)
@@ -83,24 +179,20 @@ class ImageConvertor:
         ]
 
         try:
-            logger.info(f"Starting RTSTRUCT conversion: {command}")
             result = subprocess.run(command, capture_output=True, text=True)
-
-            logger.info(f"stdout: {result.stdout}")
-            logger.info(f"stderr: {result.stderr}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"stdout: {result.stdout}")
+                logger.debug(f"stderr: {result.stderr}")
 
             if result.returncode != 0:
-                logger.error(f"RTSTRUCT conversion failed with return code {result.returncode}")
-                logger.info("\n\n")
+                logger.error(f"RTSTRUCT conversion failed with return code {result.returncode}: {result.stderr}")
                 return False
 
-            logger.info(f"RTSTRUCT conversion successful. Output saved with prefix: {output_prefix}")
-            logger.info("\n\n")
+            logger.info(f"RTSTRUCT conversion successful. Output saved with prefix: {output_prefix} ({command})")
             return True
 
         except Exception as e:
             logger.error(f"Exception during RTSTRUCT conversion: {str(e)}")
-            logger.info("\n\n")
             return False
 
     @staticmethod
@@ -111,6 +203,9 @@ class ImageConvertor:
     ) -> bool:
         """Converts a DICOM CT image series (directory or list of files) to a NIFTI image using sitk.
 
+        A list of files is sorted with ``arrange_files`` and stacked with pydicom, falling back to
+        ``sitk.ImageSeriesReader`` if that fails; a directory is read with ``sitk.ImageSeriesReader``.
+
         :param Union[str, Path, List[Union[str, Path]]] input_files: Path to the DICOM directory or a list of DICOM file
         paths.
         :param Union[str, Path] output_name: Path to the output NIFTI file (must end with .nii.gz).
@@ -139,8 +234,15 @@ class ImageConvertor:
                 return False
 
             logger.debug(f"Found {len(dicom_files)} DICOM files.")
-            reader.SetFileNames(dicom_files)
-            image = reader.Execute()
+            image = None
+            if isinstance(input_files, list):
+                try:
+                    image = _stack_dicom_series(dicom_files)
+                except Exception as e:
+                    logger.debug(f"Falling back to sitk.ImageSeriesReader: {e}")
+            if image is None:
+                reader.SetFileNames(dicom_files)
+                image = reader.Execute()
         except Exception as e:
             logger.error(f"Error reading DICOM series: {e}")
             return False
@@ -172,13 +274,13 @@ class ImageConvertor:
         z_positions = []
         valid_files = []
 
-        for file in list_of_files:
-            file_path = Path(file)
+        file_paths = [str(file) for file in list_of_files]
+        with ThreadPoolExecutor() as executor:
+            futures = [executor.submit(_read_instance_number, file_path) for file_path in file_paths]
+        for file_path, future in zip(file_paths, futures):
             try:
-                dicom_image = sitk.ReadImage(str(file_path))
-                z = float(dicom_image.GetMetaData("0020|0013"))  # Instance Number
-                z_positions.append(z)
-                valid_files.append(str(file_path))
+                z_positions.append(future.result())  # Instance Number
+                valid_files.append(file_path)
             except Exception as e:
                 logger.warning(f"Skipping file {file_path}: {e}")
 
@@ -1,6 +1,6 @@
 """."""
 
-from typing import Tuple
+from typing import Dict, Tuple
 
 import pydicom
 
@@ -8,6 +8,15 @@ import pydicom
 class DICOMNestedTags:
     """Class with methods to get Nested-Modallity specific DICOM metadata."""
 
+    # Top-level keywords each method reads, so callers can restrict parsing with ``specific_tags``.
+    REQUIRED_TAGS: Dict[str, Tuple[str, ...]] = {
+        "get_rtstruct_referenced_series_uid": ("ReferencedFrameOfReferenceSequence",),
+        "get_rtstruct_frame_of_reference_uid": ("ReferencedFrameOfReferenceSequence",),
+        "get_rtstruct_structureset_roi_names": ("StructureSetROISequence",),
+        "get_rtplan_referenced_sop_instance_uid": ("ReferencedStructureSetSequence",),
+        "get_rtdose_referenced_sop_instance_uid": ("ReferencedRTPlanSequence",),
+    }
+
     @staticmethod
     def get_rtstruct_referenced_series_uid(dicom_header: pydicom.FileDataset) -> Tuple[str, str]:
         """Collect Referenced Series UID from RTSTRUCT.
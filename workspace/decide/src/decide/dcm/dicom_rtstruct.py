@@ -2,16 +2,245 @@
 
 import logging
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
 import pydicom
 import SimpleITK as sitk
-from scipy.ndimage import binary_fill_holes
-from skimage.draw import polygon
+from pydicom.dataelem import RawDataElement
+from pydicom.tag import Tag
+from scipy.ndimage import generate_binary_structure, label
 
+from decide.dcm._polyfill import fill_polygon
 from decide.utils.logger import setup_logger
 
+_FILL_STRUCTURE = generate_binary_structure(2, 1)
+# Points times edges per call of the exact point-in-polygon test.
+_IN_POLYGON_BLOCK = 1 << 20
+_CONTOUR_DATA_TAG = Tag(0x3006, 0x0050)
+_METADATA_TAGS = [
+    "StructureSetROISequence",
+    "ROIContourSequence",
+    "RTROIObservationsSequence",
+    "ReferencedFrameOfReferenceSequence",
+]
+
+
+def _contour_points(contour: pydicom.Dataset) -> Union[np.ndarray, None]:
+    """Read the ContourData of a contour item as a flat float64 array.
+
+    A still-raw element is parsed straight from its backslash separated DS bytes, which avoids creating one ``DSfloat``
+    per value; converted elements go through ``np.fromiter``.
+
+    :param pydicom.Dataset contour: Item of a ContourSequence.
+    :return Union[np.ndarray, None]: The coordinates, or None if the item has no ContourData.
+    """
+    element = contour.get_item(_CONTOUR_DATA_TAG)
+    if element is None:
+        return None
+    if isinstance(element, RawDataElement) and element.value is not None:
+        values = element.value.split(b"\\") if element.value.strip() else []
+        try:
+            return np.array(values, dtype=np.float64)
+        except ValueError:
+            pass
+    contour_data = contour.ContourData
+    if contour_data is None:
+        return None
+    if isinstance(contour_data, (str, bytes, float, int)):
+        contour_data = [contour_data]
+    return np.fromiter(contour_data, dtype=np.float64, count=len(contour_data))
+
+
+def _fill_holes(slice_mask: np.ndarray) -> np.ndarray:
+    """Fill holes of a 2D binary mask, as ``scipy.ndimage.binary_fill_holes`` with its default structure.
+
+    Background components are labelled in one linear pass and every component not touching the border is filled,
+    instead of the iterative dilation ``binary_fill_holes`` performs.
+
+    :param np.ndarray slice_mask: 2D boolean mask, filled in place.
+    :return np.ndarray: The filled ``slice_mask``.
+    """
+    labels, num_labels = label(~slice_mask, structure=_FILL_STRUCTURE)
+    holes = np.ones(num_labels + 1, dtype=bool)
+    holes[0] = False
+    holes[labels[0]] = False
+    holes[labels[-1]] = False
+    holes[labels[:, 0]] = False
+    holes[labels[:, -1]] = False
+    slice_mask |= holes[labels]
+    return slice_mask
+
+
+def _bucket_slices(slice_indices: np.ndarray, num_slices: int) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Group contours by slice index, dropping those outside the volume.
+
+    :param np.ndarray slice_indices: Slice index of each contour.
+    :param int num_slices: Number of slices in the volume.
+    :return Tuple[np.ndarray, List[np.ndarray]]: The occupied slice indices and, per slice, the contour indices in
+    their original order.
+    """
+    contour_ids = np.flatnonzero((slice_indices >= 0) & (slice_indices < num_slices))
+    if not contour_ids.size:
+        return contour_ids, []
+    contour_ids = contour_ids[np.argsort(slice_indices[contour_ids], kind="stable")]
+    sorted_slices = slice_indices[contour_ids]
+    boundaries = np.flatnonzero(sorted_slices[1:] != sorted_slices[:-1]) + 1
+    return sorted_slices[np.concatenate(([0], boundaries))], np.split(contour_ids, boundaries)
+
+
+def _in_polygon(rows: np.ndarray, cols: np.ndarray, point_rows: np.ndarray, point_cols: np.ndarray) -> np.ndarray:
+    """Exact point-in-polygon test counting edges and vertices as inside, as ``skimage.draw.polygon`` does.
+
+    :param np.ndarray rows: Polygon vertex rows.
+    :param np.ndarray cols: Polygon vertex columns.
+    :param np.ndarray point_rows: Rows of the points to test.
+    :param np.ndarray point_cols: Columns of the points to test.
+    :return np.ndarray: Boolean array, True for points inside or on the boundary.
+    """
+    yi = rows[None, :] - point_rows[:, None]
+    xi = cols[None, :] - point_cols[:, None]
+    yj = np.roll(yi, 1, axis=1)
+    xj = np.roll(xi, 1, axis=1)
+    vertex = ((xi == 0) & (yi == 0)).any(axis=1)
+    right = (yi > 0) != (yj > 0)
+    left = (yi < 0) != (yj < 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = (xi * yj - xj * yi) / (yj - yi)
+    right_odd = (right & (x_cross > 0)).sum(axis=1) % 2
+    left_odd = (left & (x_cross < 0)).sum(axis=1) % 2
+    return vertex | (right_odd != left_odd) | (right_odd == 1)
+
+
+def _polygon(rows: np.ndarray, cols: np.ndarray, shape: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Rasterize a polygon with a vectorized scanline fill; drop-in for ``skimage.draw.polygon``.
+
+    All rows are intersected with all edges at once and filled between pairs of crossings. The two pixels around a
+    crossing, and every pixel of a row passing through a vertex, are then decided with skimage's own per-pixel
+    arithmetic, so rounding near the edges comes out the same as in skimage.
+
+    :param np.ndarray rows: Polygon vertex rows.
+    :param np.ndarray cols: Polygon vertex columns.
+    :param Tuple[int, int] shape: Image shape used to clip the output.
+    :return Tuple[np.ndarray, np.ndarray]: Row and column indices of the pixels inside the polygon.
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    cols = np.asarray(cols, dtype=np.float64)
+    first_row = max(0, int(rows.min()))
+    last_row = min(shape[0] - 1, int(np.ceil(rows.max())))
+    if last_row < first_row:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    next_rows, next_cols = np.roll(rows, -1), np.roll(cols, -1)
+    row_idx = np.arange(first_row, last_row + 1)
+    y = row_idx[:, None].astype(np.float64)
+
+    # Interior: crossings of each row with the edges, filled pairwise between sorted crossings.
+    crossing = (rows <= y) != (next_rows <= y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = np.where(crossing, (next_cols - cols) * (y - rows) / (next_rows - rows) + cols, np.inf)
+    order = np.argsort(x_cross, axis=1)
+    x_cross = np.take_along_axis(x_cross, order, axis=1)
+    if x_cross.shape[1] % 2:
+        x_cross = np.pad(x_cross, ((0, 0), (0, 1)), constant_values=np.inf)
+    starts = np.ceil(np.clip(x_cross[:, 0::2], 0, shape[1])).astype(np.intp)
+    ends = np.ceil(np.clip(x_cross[:, 1::2], 0, shape[1])).astype(np.intp)
+    lengths = np.maximum(ends - starts, 0).ravel()
+    starts = starts.ravel()
+    rr = np.repeat(np.repeat(row_idx, x_cross.shape[1] // 2), lengths)
+    cc = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths - starts, lengths)
+    region = np.zeros((row_idx.size, shape[1]), dtype=bool)
+    region[rr - first_row, cc] = True
+
+    # Near a crossing the fill may round differently from skimage, so those pixels are tested against the edges
+    # crossing their row, the only ones that count in skimage's test when no vertex lies on the row.
+    vertex_row = (rows == y).any(axis=1)
+    num_cross = crossing.sum(axis=1)
+    max_cross = int(num_cross.max())
+    if max_cross:
+        edges = order[:, :max_cross]
+        counted = np.arange(max_cross) < num_cross[:, None]
+        near = np.floor(np.where(counted, x_cross[:, :max_cross], 0))[:, :, None] + np.arange(2)
+        near = near.reshape(row_idx.size, -1)
+        tested = np.repeat(counted, 2, axis=1) & (near >= 0) & (near < shape[1]) & ~vertex_row[:, None]
+        y0 = (next_rows[edges] - y)[:, None, :]
+        y1 = (rows[edges] - y)[:, None, :]
+        step = max(1, _IN_POLYGON_BLOCK // (2 * max_cross * max_cross))
+        for i in range(0, row_idx.size, step):
+            block = slice(i, i + step)
+            c = near[block, :, None]
+            x0 = next_cols[edges[block]][:, None, :] - c
+            x1 = cols[edges[block]][:, None, :] - c
+            with np.errstate(divide="ignore", invalid="ignore"):
+                xx = (x0 * y1[block] - x1 * y0[block]) / (y1[block] - y0[block])
+            right_odd = ((xx > 0) & counted[block, None, :]).sum(axis=2) % 2
+            left_odd = ((xx < 0) & counted[block, None, :]).sum(axis=2) % 2
+            inside = (right_odd != left_odd) | (right_odd == 1)
+            block_r, block_c = np.nonzero(tested[block])
+            region[block_r + i, near[block][block_r, block_c].astype(np.intp)] = inside[block_r, block_c]
+
+    # Rows through a vertex go through the full test for every column of the bounding box.
+    vertex_rows = row_idx[vertex_row]
+    if vertex_rows.size:
+        span = np.arange(max(0, int(cols.min())), min(shape[1] - 1, int(np.ceil(cols.max()))) + 1)
+        cand_r, cand_c = np.repeat(vertex_rows, span.size), np.tile(span, vertex_rows.size)
+        step = max(1, _IN_POLYGON_BLOCK // rows.size)
+        for i in range(0, cand_r.size, step):
+            block_r, block_c = cand_r[i : i + step], cand_c[i : i + step]
+            region[block_r - first_row, block_c] = _in_polygon(rows, cols, block_r.astype(np.float64), block_c)
+    rr, cc = np.nonzero(region)
+    return rr + first_row, cc
+
+
+def _contour_polygon(
+    contour: pydicom.Dataset, contour_data: np.ndarray, indices: np.ndarray
+) -> Union[Tuple[np.ndarray, np.ndarray, int], None]:
+    """Prepare a contour for rasterization.
+
+    :param pydicom.Dataset contour: Item of a ContourSequence.
+    :param np.ndarray contour_data: (N, 3) physical coordinates of the contour.
+    :param np.ndarray indices: (N, 3) voxel indices of the contour.
+    :return Union[Tuple[np.ndarray, np.ndarray, int], None]: (row, column, weight), with a weight of -1 for "SUB"
+    contours and 1 otherwise, or None if the contour has fewer than three points.
+    """
+    x_coords, y_coords = indices[:, 0], indices[:, 1]
+    if len(x_coords) < 3:
+        return None
+    contour_type = getattr(contour, "ContourGeometricType", "CLOSED_PLANAR")
+    if contour_type == "CLOSED_PLANAR" and not np.allclose(contour_data[0], contour_data[-1]):
+        x_coords = np.append(x_coords, x_coords[0])
+        y_coords = np.append(y_coords, y_coords[0])
+    is_sub = hasattr(contour, "ContourStatus") and contour.ContourStatus == "SUB"
+    return y_coords, x_coords, -1 if is_sub else 1
+
+
+def _rasterize_slice(
+    polygons: List[Tuple[np.ndarray, np.ndarray, int]], *, shape: Tuple[int, int], fill_holes: bool
+) -> Union[np.ndarray, None]:
+    """Rasterize the contours of one slice into a bit-packed mask.
+
+    Add (+1) and subtract (-1) contours are summed so the result does not depend on their order.
+
+    :param List[Tuple[np.ndarray, np.ndarray, int]] polygons: (row, column, weight) of each contour on the slice.
+    :param Tuple[int, int] shape: (rows, columns) of the slice.
+    :param bool fill_holes: Whether to fill holes in the slice.
+    :return Union[np.ndarray, None]: The slice packed along the columns with ``np.packbits``, or None if it is empty.
+    """
+    coverage = np.zeros(shape, dtype=np.int8)
+    for rows, cols, weight in polygons:
+        if fill_polygon is not None:
+            fill_polygon(coverage, rows, cols, weight)
+        else:
+            rr, cc = _polygon(rows, cols, shape=shape)
+            coverage[rr, cc] += weight
+
+    slice_mask = coverage > 0
+    if not slice_mask.any():
+        return None
+    if fill_holes:
+        _fill_holes(slice_mask)
+    return np.packbits(slice_mask, axis=1)
+
 
 class RTStruct:
     """RTSTRUCT class for all RTSTRUCT modality-related tools."""
@@ -21,6 +250,8 @@ class RTStruct:
         rtstruct_path: Union[Path, str],
         referenced_image_path: Union[str, List[str], Path] = None,
         logger: logging.Logger = None,
+        *,
+        metadata_only: bool = False,
     ):
         """
         Initialize the RTStruct object.
@@ -29,6 +260,7 @@ class RTStruct:
         :param referenced_image_path: Path to the referenced image (DICOM folder, list of files, or NIfTI file),
         defaults to None.
         :param logger: Optional logger object, defaults to a new logger with INFO level.
+        :param metadata_only: Read only the ROI sequences (see ``from_metadata_only``), defaults to False.
         :raises FileNotFoundError: If the RTSTRUCT path does not exist or no DICOM file is found in the directory.
         :raises IOError: If the RTSTRUCT file cannot be read.
         """
@@ -48,22 +280,48 @@ class RTStruct:
         else:
             self.rtstruct_path = rtstruct_path
 
+        self.metadata_only = metadata_only
+        read_options = {"specific_tags": _METADATA_TAGS, "defer_size": "1 KB"} if metadata_only else {}
         try:
-            self.rtstruct = pydicom.dcmread(self.rtstruct_path)
+            self.rtstruct = pydicom.dcmread(self.rtstruct_path, **read_options)
             self.logger.info(f"Loaded RTSTRUCT from {self.rtstruct_path}")
         except Exception as e:
             self.logger.error(f"Failed to read RTSTRUCT file: {e}")
             raise IOError(f"Failed to read RTSTRUCT file: {e}")
 
-        self.roi_dict = {
-            roi.get("ROIName"): (indx, roi.get("ROINumber"))
-            for indx, roi in enumerate(self.rtstruct.get("StructureSetROISequence", []))
-        }
+        self._rebuild_roi_dict()
 
         self.referenced_image = None
+        self._metadata_loaded = False
         if referenced_image_path:
             self.set_reference_image(referenced_image_path)
 
+    @classmethod
+    def from_metadata_only(
+        cls,
+        rtstruct_path: Union[Path, str],
+        referenced_image_path: Union[str, List[str], Path] = None,
+        logger: logging.Logger = None,
+    ) -> "RTStruct":
+        """Create an RTStruct that reads only the ROI related sequences of the RTSTRUCT file.
+
+        Enough for pruning, renaming, validation and mask generation; such an object cannot be saved with
+        ``save_rtstruct`` because all other elements are skipped.
+
+        :param Union[Path, str] rtstruct_path: Path to the RTSTRUCT DICOM file or a directory containing it.
+        :param Union[str, List[str], Path] referenced_image_path: Path to the referenced image, defaults to None.
+        :param logging.Logger logger: Optional logger object, defaults to None
+        :return RTStruct: The RTStruct object.
+        """
+        return cls(rtstruct_path, referenced_image_path, logger, metadata_only=True)
+
+    def _rebuild_roi_dict(self) -> None:
+        """Rebuild ``roi_dict`` (ROI name -> (sequence index, ROI number)) from the StructureSetROISequence."""
+        self.roi_dict = {
+            roi.ROIName: (indx, roi.ROINumber)
+            for indx, roi in enumerate(self.rtstruct.get("StructureSetROISequence", []))
+        }
+
     def set_reference_image(self, referenced_image_path: Union[str, List[str], Path]) -> None:
         """Set the reference image for the RTSTRUCT.
 
@@ -81,6 +339,7 @@ class RTStruct:
                 else:
                     self.referenced_image = sitk.ReadImage(str(path))
                     self.logger.info(f"Loaded referenced image from {path}")
+            self._metadata_loaded = False
             self._load_metadata()
         except Exception as e:
             self.logger.error(f"Failed to set reference image: {e}")
@@ -106,11 +365,39 @@ class RTStruct:
             raise
 
     def _load_metadata(self) -> None:
-        """Load metadata from the referenced image including spacing, origin, direction, and image size."""
+        """Load metadata from the referenced image including spacing, origin, direction, and image size.
+
+        The values are read once per reference image; ``set_reference_image`` invalidates them.
+        """
+        if self._metadata_loaded:
+            return
         self.spacing = self.referenced_image.GetSpacing()
         self.origin = self.referenced_image.GetOrigin()
         self.direction = self.referenced_image.GetDirection()
         self.image_size = self.referenced_image.GetSize()
+        self.origin_np = np.asarray(self.origin, dtype=np.float64)
+        self.spacing_np = np.asarray(self.spacing, dtype=np.float64)
+        self._axis_aligned = np.allclose(self.direction, np.eye(3).ravel())
+        if self._axis_aligned:
+            self._inv_spacing = None if np.all(self.spacing_np == 1) else 1.0 / self.spacing_np
+        else:
+            # Physical point = origin + direction @ (spacing * index), so index = inverse @ (point - origin).
+            direction = np.asarray(self.direction, dtype=np.float64).reshape(3, 3)
+            self._physical_to_index = np.linalg.inv(direction * self.spacing_np)
+        self._metadata_loaded = True
+
+    def _points_to_indices(self, points: np.ndarray) -> np.ndarray:
+        """Transform physical points to continuous (x, y, z) voxel indices of the referenced image.
+
+        :param np.ndarray points: (N, 3) array of physical coordinates.
+        :return np.ndarray: (N, 3) array of voxel indices.
+        """
+        indices = points - self.origin_np
+        if not self._axis_aligned:
+            return indices @ self._physical_to_index.T
+        if self._inv_spacing is not None:
+            indices *= self._inv_spacing
+        return indices
 
     def get_binary_mask(self, roi_name: str, *, fill_holes: bool = False) -> Union[sitk.Image, bool]:
         """Generate a binary mask for a specified ROI.
@@ -122,7 +409,7 @@ class RTStruct:
         """
         if self.referenced_image:
             self._load_metadata()
-            return self._make_binary_mask(roi_name, fill_holes)
+            return self._make_binary_mask(roi_name, fill_holes=fill_holes)
         else:
             self.logger.warning("Referenced image not set. Please provide a DICOM or NIfTI image.")
             return False
@@ -135,7 +422,17 @@ class RTStruct:
         :raises ValueError: If the ROI name is not found in the RTSTRUCT.
         :return sitk.Image: Binary mask of the ROI with proper metadata.
         """
-        mask_array = np.zeros(self.image_size[::-1], dtype=np.uint8)
+        return self._make_binary_mask_with_flag(roi_name, fill_holes=fill_holes)[0]
+
+    def _make_binary_mask_with_flag(self, roi_name: str, *, fill_holes: bool = False) -> Tuple[sitk.Image, bool]:
+        """Create a binary mask for a specified ROI and report whether any voxel was set.
+
+        :param str roi_name: Name of the ROI to convert to a binary mask.
+        :param bool fill_holes: Whether to fill holes in positive contours., defaults to False
+        :raises ValueError: If the ROI name is not found in the RTSTRUCT.
+        :return Tuple[sitk.Image, bool]: Binary mask of the ROI with proper metadata, and True if it is not empty.
+        """
+        shape = self.image_size[::-1]
 
         if roi_name not in self.roi_dict:
             raise ValueError(f"ROI '{roi_name}' not found in ROI dictionary")
@@ -146,64 +443,54 @@ class RTStruct:
             roi_contour = self.rtstruct.ROIContourSequence[roi_idx]
         except (AttributeError, IndexError):
             self.logger.warning(f"No contour sequence found for ROI '{roi_name}'")
-            return self._empty_mask(mask_array)
+            return self._empty_mask(np.zeros(shape, dtype=np.uint8)), False
 
         if not hasattr(roi_contour, "ContourSequence"):
             self.logger.warning(f"ROI '{roi_name}' has no ContourSequence")
-            return self._empty_mask(mask_array)
-
-        slice_contours = {}
+            return self._empty_mask(np.zeros(shape, dtype=np.uint8)), False
 
+        contours, points = [], []
         for contour in roi_contour.ContourSequence:
-            if not hasattr(contour, "ContourData") or len(contour.ContourData) < 6:
-                continue
-
-            contour_data = np.array(contour.ContourData).reshape(-1, 3)
-            z_position = float(contour_data[0, 2])
-            slice_idx = int(round((z_position - self.origin[2]) / self.spacing[2]))
-
-            if slice_idx < 0 or slice_idx >= self.image_size[2]:
-                continue
-
-            if slice_idx not in slice_contours:
-                slice_contours[slice_idx] = []
-
-            is_sub = hasattr(contour, "ContourStatus") and contour.ContourStatus == "SUB"
-            contour_type = getattr(contour, "ContourGeometricType", "CLOSED_PLANAR")
-
-            slice_contours[slice_idx].append({"data": contour_data, "is_sub": is_sub, "type": contour_type})
-
-        for slice_idx, contours in slice_contours.items():
-            slice_mask = np.zeros(self.image_size[:2], dtype=np.uint8)
-
-            for contour_info in contours:
-                contour_data = contour_info["data"]
-                is_sub = contour_info["is_sub"]
-                contour_type = contour_info["type"]
-
-                x_coords = (contour_data[:, 0] - self.origin[0]) / self.spacing[0]
-                y_coords = (contour_data[:, 1] - self.origin[1]) / self.spacing[1]
-
-                if len(x_coords) >= 3:
-                    if contour_type == "CLOSED_PLANAR" and not np.allclose(contour_data[0], contour_data[-1]):
-                        x_coords = np.append(x_coords, x_coords[0])
-                        y_coords = np.append(y_coords, y_coords[0])
-
-                    rr, cc = polygon(y_coords, x_coords, shape=self.image_size[:2])
-
-                    if is_sub:
-                        slice_mask[rr, cc] = 0
-                    else:
-                        slice_mask[rr, cc] = 1
-
-            if np.any(slice_mask) and fill_holes:
-                slice_mask = binary_fill_holes(slice_mask).astype(np.uint8)
-
-            mask_array[slice_idx] = slice_mask
+            contour_data = _contour_points(contour)
+            if contour_data is not None and contour_data.size >= 6:
+                contours.append(contour)
+                points.append(contour_data.reshape(-1, 3))
+        if not contours:
+            return self._empty_mask(np.zeros(shape, dtype=np.uint8)), False
+
+        # Transform the points of all contours to voxel indices in one pass, then split them per contour.
+        offsets = np.cumsum([len(contour_data) for contour_data in points])[:-1]
+        all_points = np.concatenate(points)
+        all_indices = self._points_to_indices(all_points)
+        first_points = np.concatenate(([0], offsets))
+        slice_indices = np.rint(all_indices[first_points, 2]).astype(np.intp)
+        contour_indices = np.split(all_indices, offsets)
+
+        # Slices are rasterized independently and kept bit-packed (1/8 of the memory) until the volume is assembled;
+        # only contours that fall inside the volume are turned into polygons.
+        slice_ids, groups = _bucket_slices(slice_indices, self.image_size[2])
+        slice_polygons = [
+            [
+                polygon
+                for polygon in (_contour_polygon(contours[i], points[i], contour_indices[i]) for i in group)
+                if polygon is not None
+            ]
+            for group in groups
+        ]
+        packed_slices = [
+            _rasterize_slice(polygons, shape=shape[1:], fill_holes=fill_holes) for polygons in slice_polygons
+        ]
+
+        mask_array = np.zeros(shape, dtype=np.uint8)
+        any_written = False
+        for slice_idx, packed in zip(slice_ids, packed_slices):
+            if packed is not None:
+                mask_array[slice_idx] = np.unpackbits(packed, axis=1, count=shape[2])
+                any_written = True
 
         mask_sitk = sitk.GetImageFromArray(mask_array)
         mask_sitk.CopyInformation(self.referenced_image)
-        return mask_sitk
+        return mask_sitk, any_written
 
     def _empty_mask(self, mask_array: np.ndarray) -> sitk.Image:
         """Create an empty mask image with the same metadata as the referenced image.
@@ -230,10 +517,10 @@ class RTStruct:
         :return bool: True if the mask was successfully saved, False otherwise.
         """
         try:
-            mask = self.get_binary_mask(roi_name, fill_holes)
-            if isinstance(mask, sitk.Image):
-                array = sitk.GetArrayFromImage(mask)
-                if not np.any(array):
+            if self.referenced_image:
+                self._load_metadata()
+                mask, any_written = self._make_binary_mask_with_flag(roi_name, fill_holes=fill_holes)
+                if not any_written:
                     if prune_empty:
                         raise ValueError(f"Mask for ROI '{roi_name}' is empty and prune_empty=True.")
                     else:
@@ -259,19 +546,17 @@ class RTStruct:
         :fixlater Exception: If pruning fails due to malformed RTSTRUCT.
         """
         try:
-            roi_numbers_to_keep = []
-            structure_set_roi_sequences_to_keep = []
-
-            for roi_seq in self.rtstruct.StructureSetROISequence:
-                if roi_seq.ROIName in rois_to_keep:
-                    roi_numbers_to_keep.append(roi_seq.ROINumber)
-                    structure_set_roi_sequences_to_keep.append(roi_seq)
-
-            roi_contour_sequences_to_keep = []
-            if hasattr(self.rtstruct, "ROIContourSequence"):
-                for roi_contour_seq in self.rtstruct.ROIContourSequence:
-                    if roi_contour_seq.ReferencedROINumber in roi_numbers_to_keep:
-                        roi_contour_sequences_to_keep.append(roi_contour_seq)
+            keep_names = set(rois_to_keep)
+            structure_set_roi_sequences_to_keep = [
+                roi_seq for roi_seq in self.rtstruct.StructureSetROISequence if roi_seq.ROIName in keep_names
+            ]
+            keep_numbers = {roi_seq.ROINumber for roi_seq in structure_set_roi_sequences_to_keep}
+
+            roi_contour_sequences_to_keep = [
+                roi_contour_seq
+                for roi_contour_seq in self.rtstruct.get("ROIContourSequence", [])
+                if roi_contour_seq.ReferencedROINumber in keep_numbers
+            ]
 
             self.rtstruct.StructureSetROISequence = pydicom.sequence.Sequence(structure_set_roi_sequences_to_keep)
             if roi_contour_sequences_to_keep:
@@ -281,16 +566,11 @@ class RTStruct:
 
             if hasattr(self.rtstruct, "RTROIObservationsSequence"):
                 filtered_rt_observations = [
-                    obs
-                    for obs in self.rtstruct.RTROIObservationsSequence
-                    if obs.ReferencedROINumber in roi_numbers_to_keep
+                    obs for obs in self.rtstruct.RTROIObservationsSequence if obs.ReferencedROINumber in keep_numbers
                 ]
                 self.rtstruct.RTROIObservationsSequence = pydicom.sequence.Sequence(filtered_rt_observations)
 
-            self.roi_dict = {
-                roi.get("ROIName"): (indx, roi.get("ROINumber"))
-                for indx, roi in enumerate(self.rtstruct.get("StructureSetROISequence", []))
-            }
+            self._rebuild_roi_dict()
 
             self.logger.info(f"Pruned RTSTRUCT to keep ROIs: {rois_to_keep}")
         except Exception as e:
@@ -309,17 +589,17 @@ class RTStruct:
                     old_name = roi.ROIName
                     roi.ROIName = rename_map[old_name]
                     self.logger.info(f"Renamed ROI '{old_name}' to '{roi.ROIName}'")
+            self._rebuild_roi_dict()
         except Exception as e:
             self.logger.error(f"Error renaming ROIs: {e}")
             raise
 
-    def validate_roi(self, roi_name: str) -> List:
-        """To checks if the contours of the specified ROI are unequally spaced along the Z-axis.
+    def validate_roi(self, roi_name: str) -> bool:
+        """To checks if the contours of the specified ROI are equally spaced along the Z-axis.
 
         :param str roi_name: Name of the ROI to validate.
-        :raises ValueError: True if Z-values are equally spaced, False otherwise.
         :raises ValueError: If the ROI name is not found or has no contour data.
-        :return List: the spacings along z axis.
+        :return bool: True if Z-values are equally spaced (or there are fewer than two contours), False otherwise.
         """
         if roi_name not in self.roi_dict:
             raise ValueError(f"ROI '{roi_name}' not found in RTSTRUCT.")
@@ -330,27 +610,25 @@ class RTStruct:
         if not contour_sequence:
             raise ValueError(f"No contour data found for ROI '{roi_name}'.")
 
-        z_values = []
-        for contour in contour_sequence:
-            coords = contour.get("ContourData", [])
-            if coords:
-                # Assuming each contour is a closed polygon in one plane
-                z_values.append(coords[2])  # Z-value of the first point
+        # Assuming each contour is a closed polygon in one plane, the Z-value of its first point
+        points = (_contour_points(contour) for contour in contour_sequence)
+        z_values = np.fromiter((coords[2] for coords in points if coords is not None and coords.size), np.float64)
 
-        if len(z_values) < 2:
+        if z_values.size < 2:
             return True  # Not enough data to determine spacing
-        z_values_sorted = sorted(z_values)
-        spacings = [round(z_values_sorted[i + 1] - z_values_sorted[i], 5) for i in range(len(z_values_sorted) - 1)]
-
-        return spacings
+        spacings = np.diff(np.sort(z_values))
+        return bool(np.ptp(spacings) < 1e-5)
 
     def save_rtstruct(self, output_filepath: Union[str, Path]) -> None:
         """
         Save the modified RTSTRUCT to a file.
 
         :param Union[str, Path] output_filepath: Path to save the RTSTRUCT DICOM file.
-        :raises IOError: If saving fails due to file system issues.
+        :raises IOError: If saving fails due to file system issues or the RTSTRUCT was read with metadata_only.
         """
+        if self.metadata_only:
+            self.logger.error("Cannot save an RTSTRUCT that was read with metadata_only.")
+            raise IOError(f"Cannot save RTSTRUCT to '{output_filepath}': only its ROI sequences were read.")
         try:
             self.rtstruct.save_as(str(output_filepath))
             self.logger.info(f"Saved RTSTRUCT to {output_filepath}")
@@ -1,12 +1,202 @@
 """Validate the DICOM Image Series."""
 
 import logging
-from collections import Counter
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple, Union
 
 import numpy as np
 import pydicom
+from pydicom.dataelem import RawDataElement
+from pydicom.multival import MultiValue
+
+# Elements needed to decode the pixel data of a slice
+_PIXEL_TAGS = [
+    "Rows",
+    "Columns",
+    "BitsAllocated",
+    "BitsStored",
+    "HighBit",
+    "PixelRepresentation",
+    "SamplesPerPixel",
+    "PhotometricInterpretation",
+    "PlanarConfiguration",
+    "NumberOfFrames",
+    "PixelData",
+]
+
+# Elements read for the metadata of a slice, next to the pixel elements
+_METADATA_TAGS = [
+    "SeriesInstanceUID",
+    "InstanceNumber",
+    "ImagePositionPatient",
+    "Modality",
+    "PixelSpacing",
+    "SliceThickness",
+    "ImageOrientationPatient",
+    "PatientID",
+    "StudyInstanceUID",
+    *_PIXEL_TAGS,
+]
+
+# Elements read for the position of a slice
+_POSITION_TAGS = ["InstanceNumber", "ImagePositionPatient"]
+
+# Metadata fields that must have one value across the series
+_CONSISTENCY_FIELDS = [
+    "Modality",
+    "PixelSpacing",
+    "SliceThickness",
+    "ImageOrientationPatient",
+    "PatientID",
+    "StudyInstanceUID",
+]
+
+
+def _hashable(value: Any) -> Any:
+    """Make a multi-valued element value hashable, to collect it in a set.
+
+    :param Any value: Element value.
+    :return Any: A tuple for multi-valued elements, otherwise the value itself.
+    """
+    return tuple(value) if isinstance(value, MultiValue) else value
+
+
+def _any_stored_bits(
+    buffer: Union[bytes, mmap.mmap], offset: int, length: int, bits_allocated: int, bits_stored: int
+) -> bool:
+    """Check whether any uncompressed little endian pixel has a nonzero stored value, reading the buffer in place.
+
+    :param Union[bytes, mmap.mmap] buffer: Pixel data bytes or the mapped file.
+    :param int offset: Offset of the pixel data in the buffer.
+    :param int length: Length of the pixel data in bytes.
+    :param int bits_allocated: Bits allocated per pixel, a multiple of 8.
+    :param int bits_stored: Bits stored per pixel, the bits above are ignored as by ``pixel_array``.
+    :return bool: True if any pixel is nonzero.
+    """
+    item_size = bits_allocated // 8
+    pixels = np.frombuffer(buffer, dtype=f"<u{item_size}", count=length // item_size, offset=offset)
+    if not pixels.any():
+        return False
+    if bits_stored >= bits_allocated:
+        return True
+    return bool(np.bitwise_and(pixels, (1 << bits_stored) - 1).any())
+
+
+def _any_nonzero_pixel(dicom: pydicom.Dataset, f: BinaryIO) -> bool:
+    """Check whether a slice read with deferred pixel data has any nonzero pixel.
+
+    Uncompressed little endian pixel data is memory-mapped and scanned in place, so the scan stops at the first
+    nonzero pixel without reading the rest of the file. Other transfer syntaxes are decoded with ``pixel_array``.
+
+    :param pydicom.Dataset dicom: Slice read from ``f`` with a ``defer_size``.
+    :param BinaryIO f: The open DICOM file.
+    :return bool: True if any pixel is nonzero.
+    """
+    element = dicom.get_item("PixelData", keep_deferred=True)
+    syntax = getattr(dicom, "file_meta", {}).get("TransferSyntaxUID")
+    bits_allocated = dicom.get("BitsAllocated")
+    raw = (
+        element is not None
+        and element.length != 0xFFFFFFFF
+        and syntax is not None
+        and syntax.is_little_endian
+        and not syntax.is_encapsulated
+        and not syntax.is_deflated
+        and bits_allocated in (8, 16, 32, 64)
+    )
+    if not raw:
+        return bool(dicom.pixel_array.any())
+
+    bits_stored = dicom.get("BitsStored") or bits_allocated
+    if isinstance(element.value, bytes):
+        # Small pixel data is read with the header, scan its bytes
+        return _any_stored_bits(element.value, 0, len(element.value), bits_allocated, bits_stored)
+    if not isinstance(element, RawDataElement) or element.value is not None:
+        return bool(dicom.pixel_array.any())
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return _any_stored_bits(buffer, element.value_tell, element.length, bits_allocated, bits_stored)
+
+
+def _has_nonzero_pixels(file_path: Union[str, Path]) -> bool:
+    """Check whether a slice has any nonzero pixel, reading only the pixel data and the elements describing it.
+
+    :param Union[str, Path] file_path: DICOM file.
+    :return bool: True if any pixel is nonzero.
+    """
+    with open(file_path, "rb") as f:
+        dicom = pydicom.dcmread(f, force=True, specific_tags=_PIXEL_TAGS, defer_size="1 KB")
+        return _any_nonzero_pixel(dicom, f)
+
+
+def _read_position(file_path: Union[str, Path]) -> Optional[Tuple[Any, Any]]:
+    """Read the instance number and Z-position of a slice from its header.
+
+    :param Union[str, Path] file_path: DICOM file.
+    :return Optional[Tuple[Any, Any]]: Instance number and Z-position, None if the file can not be read.
+    """
+    try:
+        dicom = pydicom.dcmread(file_path, stop_before_pixels=True, force=True, specific_tags=_POSITION_TAGS)
+        instance_number = getattr(dicom, "InstanceNumber", None)
+        z_position = getattr(dicom, "ImagePositionPatient", [None, None, None])[2]
+        return instance_number, z_position
+    except Exception:
+        return None  # Skip unreadable files
+
+
+def _read_positions(ct_files: Union[List[Union[str, Path]], Path]) -> List[Tuple[Any, Any]]:
+    """Read the instance numbers and Z-positions of a series, reading the headers concurrently.
+
+    :param Union[List[Union[str, Path]], Path] ct_files: List of CT file paths or a directory containing the CT
+    series files.
+    :return List[Tuple[Any, Any]]: Instance number and Z-position of the readable slices that have both.
+    """
+    if isinstance(ct_files, (str, Path)):
+        ct_files = sorted(Path(ct_files).glob("*.dcm"))
+    if not ct_files:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(32, len(ct_files))) as executor:
+        slice_data = list(executor.map(_read_position, ct_files))
+
+    return [x for x in slice_data if x is not None and x[0] is not None and x[1] is not None]
+
+
+def _inconsistent_positions(z_positions: List[float]) -> List[float]:
+    """Find the positions followed by a spacing other than the most common one.
+
+    Spacings are compared after rounding to 10 decimals; ties go to the spacing that occurs first.
+
+    :param List[float] z_positions: Z-positions of slices.
+    :return List[float]: Sorted Z-positions where the next spacing deviates from the majority spacing.
+    """
+    sorted_positions = np.sort(np.asarray(z_positions, dtype=np.float64))
+    differences = np.round(np.diff(sorted_positions), 10)
+    if not differences.size:
+        return []
+
+    values, first, counts = np.unique(differences, return_index=True, return_counts=True)
+    tied = counts == counts.max()
+    most_common_diff = values[tied][first[tied].argmin()]
+    return sorted_positions[:-1][differences != most_common_diff].tolist()
+
+
+def _missing_instances(instance_numbers: List[int]) -> List[int]:
+    """Find the instance numbers missing from 1 up to the highest one present.
+
+    :param List[int] instance_numbers: Instance numbers of the slices.
+    :return List[int]: Sorted missing instance numbers.
+    """
+    numbers = np.asarray(instance_numbers, dtype=np.int64)
+    numbers = numbers[numbers >= 1]
+    if not numbers.size:
+        return []
+    present = np.zeros(numbers.max() + 1, dtype=bool)
+    present[numbers] = True
+    return (np.flatnonzero(~present[1:]) + 1).tolist()
 
 
 class ImageValidator:
@@ -29,10 +219,14 @@ class ImageValidator:
             logger.setLevel(logging.INFO)
         return logger
 
-    def validate_image(self, ct_files: Union[List[Union[str, Path]], Path]) -> bool:
+    def validate_image(self, ct_files: Union[List[Union[str, Path]], Path], *, fail_fast: bool = False) -> bool:
         """Validate the DICOM CT Image Series.
 
+        The checks run from cheapest to most expensive. With ``fail_fast`` the first failed check ends the validation
+        and the pixel data is only read once all metadata checks passed.
+
         :param Union[List[Union[str, Path]], Path] ct_files: CT Files
+        :param bool fail_fast: Stop at the first failed check instead of running all checks, defaults to False
         :return bool: Validation Status
         """
         if isinstance(ct_files, (str, Path)):
@@ -42,88 +236,123 @@ class ImageValidator:
             self.logger.warning("No DICOM files found.")
             return False
 
-        metadata_list = []
-        for file in ct_files:
-            try:
-                dicom = pydicom.dcmread(file, force=True)
-                metadata_list.append(
-                    {
-                        "SeriesInstanceUID": getattr(dicom, "SeriesInstanceUID", None),
-                        "InstanceNumber": getattr(dicom, "InstanceNumber", None),
-                        "ZPosition": getattr(dicom, "ImagePositionPatient", [None, None, None])[2],
-                        "Modality": getattr(dicom, "Modality", None),
-                        "PixelSpacing": str(getattr(dicom, "PixelSpacing", None)),
-                        "SliceThickness": str(getattr(dicom, "SliceThickness", None)),
-                        "ImageOrientationPatient": str(getattr(dicom, "ImageOrientationPatient", None)),
-                        "PatientID": getattr(dicom, "PatientID", None),
-                        "StudyInstanceUID": getattr(dicom, "StudyInstanceUID", None),
-                        "HasPixelData": hasattr(dicom, "PixelData"),
-                        "FilePath": file,
-                    }
-                )
-            except Exception as e:
-                self.logger.warning(f"Failed to read {file}: {e}")
+        with ThreadPoolExecutor(max_workers=min(32, len(ct_files))) as executor:
+            read = partial(self._read_metadata, check_pixels=not fail_fast)
+            metadata_list = [m for m in executor.map(read, ct_files) if m is not None]
 
         if len(metadata_list) < 2:
             self.logger.warning("Insufficient valid DICOM slices.")
             return False
 
-        checks = {
-            "Single Series": self._check_single_series(metadata_list),
-            "Equal Z-Spacing": self._check_equal_z_spacing(metadata_list),
-            "Missing Slices": self._check_missing_slices(metadata_list),
-            "Metadata Consistency": self._check_metadata_consistency(metadata_list),
-            "Pixel Data Present": any(m["HasPixelData"] for m in metadata_list),
-            "Zero Pixel Slices": self.detect_zero_pixel_slices(metadata_list),
-        }
-
-        for check, passed in checks.items():
-            if not passed:
-                self.logger.warning(f"Validation failed: {check}")
-            else:
+        # Collect everything the checks need in one pass over the metadata
+        series_uids = set()
+        z_positions = []
+        instance_numbers = []
+        field_values = {field: set() for field in _CONSISTENCY_FIELDS}
+        has_pixel_data = False
+        for m in metadata_list:
+            if m["SeriesInstanceUID"]:
+                series_uids.add(m["SeriesInstanceUID"])
+            if m["ZPosition"] is not None:
+                z_positions.append(m["ZPosition"])
+            if m["InstanceNumber"] is not None:
+                instance_numbers.append(m["InstanceNumber"])
+            for field, values in field_values.items():
+                if m[field] is not None:
+                    values.add(m[field])
+            has_pixel_data = has_pixel_data or m["HasPixelData"]
+
+        checks = [
+            ("Single Series", lambda: self._check_single_series(series_uids)),
+            ("Equal Z-Spacing", lambda: self._check_equal_z_spacing(z_positions)),
+            ("Missing Slices", lambda: self._check_missing_slices(instance_numbers)),
+            ("Metadata Consistency", lambda: self._check_metadata_consistency(field_values)),
+            ("Pixel Data Present", lambda: has_pixel_data),
+            ("Zero Pixel Slices", lambda: self.detect_zero_pixel_slices(metadata_list)),
+        ]
+
+        all_passed = True
+        for idx, (check, run_check) in enumerate(checks):
+            if run_check():
                 self.logger.info(f"Validation passed: {check}")
+                continue
+
+            self.logger.warning(f"Validation failed: {check}")
+            all_passed = False
+            if fail_fast:
+                for skipped, _ in checks[idx + 1 :]:
+                    self.logger.info(f"Validation skipped: {skipped}")
+                break
 
-        return all(checks.values())
+        return all_passed
 
-    def _check_single_series(self, metadata_list: List[Dict[str, Any]]) -> bool:
+    def _read_metadata(self, file: Union[str, Path], *, check_pixels: bool = True) -> Optional[Dict[str, Any]]:
+        """Read the metadata of one slice.
+
+        :param Union[str, Path] file: DICOM file.
+        :param bool check_pixels: Also check for nonzero pixels while the file is open, defaults to True
+        :return Optional[Dict[str, Any]]: Metadata of the file, None if it can not be read.
+        """
+        try:
+            with open(file, "rb") as f:
+                # Pixel data is deferred: it stays on disk but its presence is still visible
+                dicom = pydicom.dcmread(f, force=True, specific_tags=_METADATA_TAGS, defer_size="1 KB")
+                metadata = {
+                    "SeriesInstanceUID": getattr(dicom, "SeriesInstanceUID", None),
+                    "InstanceNumber": getattr(dicom, "InstanceNumber", None),
+                    "ZPosition": getattr(dicom, "ImagePositionPatient", [None, None, None])[2],
+                    "Modality": getattr(dicom, "Modality", None),
+                    "PixelSpacing": _hashable(dicom.get("PixelSpacing")),
+                    "SliceThickness": dicom.get("SliceThickness"),
+                    "ImageOrientationPatient": _hashable(dicom.get("ImageOrientationPatient")),
+                    "PatientID": getattr(dicom, "PatientID", None),
+                    "StudyInstanceUID": getattr(dicom, "StudyInstanceUID", None),
+                    "HasPixelData": "PixelData" in dicom,
+                    "FilePath": file,
+                }
+                # Check the pixels while the file is open, for detect_zero_pixel_slices
+                if check_pixels:
+                    try:
+                        metadata["NonzeroPixels"] = _any_nonzero_pixel(dicom, f)
+                    except Exception as e:
+                        metadata["PixelDataError"] = e
+                return metadata
+        except Exception as e:
+            self.logger.warning(f"Failed to read {file}: {e}")
+            return None
+
+    def _check_single_series(self, series_uids: Set[str]) -> bool:
         """Check if the DICOM files belong to the same series.
 
-        :param List[Dict[str, Any]] metadata_list: Metadata of files.
+        :param Set[str] series_uids: Series Instance UIDs of files.
         :return bool: True if files belong to the same series.
         """
-        series_uids = {m["SeriesInstanceUID"] for m in metadata_list if m["SeriesInstanceUID"]}
         return len(series_uids) == 1
 
-    def _check_equal_z_spacing(self, metadata_list: List[Dict[str, Any]]) -> bool:
+    def _check_equal_z_spacing(self, z_positions: List[float]) -> bool:
         """Check if all slices are equally sapced.
 
-        :param List[Dict[str, Any]] metadata_list: Metadata of files.
+        :param List[float] z_positions: Z Positions of slices.
         :return bool: True if slices are equally spaced.
         """
-        z_positions = [m["ZPosition"] for m in metadata_list if m["ZPosition"] is not None]
         if len(z_positions) < 2:
             return False
-        z_positions_sorted = sorted(z_positions)
-        spacings = [
-            round(z_positions_sorted[i + 1] - z_positions_sorted[i], 5) for i in range(len(z_positions_sorted) - 1)
-        ]
-        return len(set(spacings)) == 1
+        spacings = np.round(np.diff(np.sort(np.asarray(z_positions, dtype=np.float64))), 5)
+        return bool(np.all(spacings == spacings[0]))
 
-    def _check_missing_slices(self, metadata_list: List[Dict[str, Any]]) -> bool:
+    def _check_missing_slices(self, instance_numbers: List[int]) -> bool:
         """Check for missing slices.
 
-        :param List[Dict[str, Any]] metadata_list: Metadata of files.
+        :param List[int] instance_numbers: Instance numbers of slices.
         :return bool: True if no slices are missing.
         """
-        instance_numbers = [m["InstanceNumber"] for m in metadata_list if m["InstanceNumber"] is not None]
         if not instance_numbers:
             self.logger.warning("No valid instance numbers found.")
             return False
 
-        expected = set(range(1, max(instance_numbers) + 1))
-        missing = expected - set(instance_numbers)
+        missing = _missing_instances(instance_numbers)
         if missing:
-            self.logger.warning(f"Missing instance numbers: {sorted(missing)}")
+            self.logger.warning(f"Missing instance numbers: {missing}")
             return False
         return True
 
@@ -133,35 +362,15 @@ class ImageValidator:
         :param List[float] z_positions: Z Positions of slices.
         :return List[float]: Inconsistant Z positions.
         """
-        sorted_positions = sorted(z_positions)
-        differences = [
-            round(sorted_positions[i + 1] - sorted_positions[i], 10) for i in range(len(sorted_positions) - 1)
-        ]
-        if not differences:
-            return []
-        most_common_diff = Counter(differences).most_common(1)[0][0]
-        inconsistent_positions = [sorted_positions[i] for i, diff in enumerate(differences) if diff != most_common_diff]
-        return inconsistent_positions
+        return _inconsistent_positions(z_positions)
 
-    def _check_metadata_consistency(self, metadata_list: List[Dict[str, Any]]) -> bool:
+    def _check_metadata_consistency(self, field_values: Dict[str, Set[Any]]) -> bool:
         """Check metadata consistency.
 
-        :param List[Dict[str, Any]] metadata_list: Metadata of files.
+        :param Dict[str, Set[Any]] field_values: Distinct values of each checked metadata field.
         :return bool: True if metadata is consistent.
         """
-        fields_to_check = [
-            "Modality",
-            "PixelSpacing",
-            "SliceThickness",
-            "ImageOrientationPatient",
-            "PatientID",
-            "StudyInstanceUID",
-        ]
-        inconsistent = {}
-        for field in fields_to_check:
-            values = {m[field] for m in metadata_list if m[field] is not None}
-            if len(values) > 1:
-                inconsistent[field] = values
+        inconsistent = {field: values for field, values in field_values.items() if len(values) > 1}
 
         if inconsistent:
             for field, values in inconsistent.items():
@@ -184,9 +393,13 @@ class ImageValidator:
 
         for idx, slice_info in enumerate(sorted_slices, start=1):
             try:
-                dicom = pydicom.dcmread(slice_info["FilePath"], force=True)
-                pixel_array = dicom.pixel_array
-                if np.all(pixel_array == 0):
+                # Use the result of the metadata pass if there is one, otherwise read the file
+                if "PixelDataError" in slice_info:
+                    raise slice_info["PixelDataError"]
+                nonzero = slice_info.get("NonzeroPixels")
+                if nonzero is None:
+                    nonzero = _has_nonzero_pixels(slice_info["FilePath"])
+                if not nonzero:
                     self.logger.warning(
                         f"Slice InstanceNumber {slice_info['InstanceNumber']}, "
                         f"({idx}-th of {total_slices}): all-zero pixel data."
@@ -206,21 +419,7 @@ class ImageValidator:
         series files.
         :return List[float]: List of Z-positions with inconsistent spacing. Empty if spacing is consistent.
         """
-        if isinstance(ct_files, (str, Path)):
-            ct_files = sorted(Path(ct_files).glob("*.dcm"))
-
-        slice_data = []
-        for file_path in ct_files:
-            try:
-                dicom = pydicom.dcmread(file_path, stop_before_pixels=True, force=True)
-                instance_number = getattr(dicom, "InstanceNumber", None)
-                z_position = getattr(dicom, "ImagePositionPatient", [None, None, None])[2]
-                slice_data.append((instance_number, z_position))
-            except Exception:
-                continue  # Skip unreadable files
-
-        slice_data = [x for x in slice_data if x[0] is not None and x[1] is not None]
-
+        slice_data = _read_positions(ct_files)
         if not slice_data:
             return []
 
@@ -237,31 +436,12 @@ class ImageValidator:
         series files.
         :return List[float]: List of missing slice instance numbers. Empty if spacing is consistent.
         """
-        if isinstance(ct_files, (str, Path)):
-            ct_files = sorted(Path(ct_files).glob("*.dcm"))
-
-        slice_data = []
-        for file_path in ct_files:
-            try:
-                dicom = pydicom.dcmread(file_path, stop_before_pixels=True, force=True)
-                instance_number = getattr(dicom, "InstanceNumber", None)
-                z_position = getattr(dicom, "ImagePositionPatient", [None, None, None])[2]
-                slice_data.append((instance_number, z_position))
-            except Exception:
-                continue  # Skip unreadable files
-
-        slice_data = [x for x in slice_data if x[0] is not None and x[1] is not None]
-
+        slice_data = _read_positions(ct_files)
         if not slice_data:
             return []
 
         # Check for missing instance numbers
-        slice_data.sort(key=lambda x: x[0])
-        given_instances = set(i[0] for i in slice_data)
-        expected_instances = set(range(1, max(given_instances) + 1))
-        missing_instances = list(expected_instances - given_instances)
-
-        return missing_instances
+        return _missing_instances([i[0] for i in slice_data])
 
     @staticmethod
     def check_equal_differences(z_positions: List[float]) -> List[float]:
@@ -270,15 +450,4 @@ class ImageValidator:
         :param List[float] z_positions: List of Z-axis positions.
         :return List[float]: List of Z-positions where spacing deviates from the majority spacing.
         """
-        sorted_positions = sorted(z_positions)
-        differences = [
-            round(sorted_positions[i + 1] - sorted_positions[i], 10) for i in range(len(sorted_positions) - 1)
-        ]
-
-        if not differences:
-            return []
-
-        most_common_diff = Counter(differences).most_common(1)[0][0]
-        inconsistent_positions = [sorted_positions[i] for i, diff in enumerate(differences) if diff != most_common_diff]
-
-        return inconsistent_positions
+        return _inconsistent_positions(z_positions)
@@ -22,17 +22,18 @@ def interpolate_missing_slices(input_path: str, output_path: str, logger: loggin
     image = sitk.ReadImage(str(input_path))
     array = sitk.GetArrayFromImage(image)  # shape: [slices, height, width]
 
-    modified = False
-
-    # Identify slices with no '1' values
-    for i in range(1, array.shape[0] - 1):
-        if np.all(array[i] == 0):
-            if np.any(array[i - 1] == 1) and np.any(array[i + 1] == 1):
-                # Perform linear interpolation
-                array[i] = (array[i - 1].astype(np.float32) + array[i + 1].astype(np.float32)) / 2
-                array[i] = (array[i] > 0.5).astype(np.uint8)  # Convert back to binary mask
-                modified = True
-                logger.debug(f"Slice {i} was interpolated.")
+    # Identify empty slices whose both neighbours contain '1' values, in one pass over the volume
+    flat = array.reshape(array.shape[0], -1)
+    is_empty = ~flat.any(axis=1)
+    has_one = (flat == 1).any(axis=1)
+    indices = np.flatnonzero(is_empty[1:-1] & has_one[:-2] & has_one[2:]) + 1
+    modified = indices.size > 0
+
+    if modified:
+        # Perform linear interpolation, then convert back to binary mask
+        array[indices] = (array[indices - 1].astype(np.float32) + array[indices + 1].astype(np.float32)) / 2
+        array[indices] = array[indices] > 0.5
+        logger.debug(f"Slices {indices.tolist()} were interpolated.")
 
     if modified:
         logger.info(f"Image was modified. Saving corrected image {input_path}.")
@@ -0,0 +1,44 @@
+"""Compiled kernels for connected component filtering.
+
+The kernels need the optional ``numba`` package (see the "fast" extra); without it ``component_sizes`` and
+``select_components`` are None and callers fall back to NumPy.
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional, see the "fast" extra
+    numba = None
+
+if numba is None:
+    component_sizes = None
+    select_components = None
+else:
+
+    @numba.njit(nogil=True, cache=True)
+    def component_sizes(labels: np.ndarray, num_components: int) -> np.ndarray:
+        """Count the voxels of every component label, reading the labels in their own type.
+
+        :param np.ndarray labels: Label volume, 0 for background.
+        :param int num_components: Highest label in the volume.
+        :return np.ndarray: Voxel count per label, indexed by label.
+        """
+        counts = np.zeros(num_components + 1, dtype=np.int64)
+        for label in labels.ravel():
+            counts[label] += 1
+        return counts
+
+    @numba.njit(nogil=True, cache=True)
+    def select_components(labels: np.ndarray, keep: np.ndarray) -> np.ndarray:
+        """Build the binary mask of the components flagged in ``keep``.
+
+        :param np.ndarray labels: Label volume, 0 for background.
+        :param np.ndarray keep: uint8 flag per label, indexed by label.
+        :return np.ndarray: uint8 mask with the shape of ``labels``.
+        """
+        flat = labels.ravel()
+        out = np.empty(flat.size, dtype=np.uint8)
+        for i in range(flat.size):
+            out[i] = keep[flat[i]]
+        return out.reshape(labels.shape)
@@ -6,10 +6,71 @@ import warnings
 from pathlib import Path
 
 # Typing
-from typing import Any, Dict, List, Optional, Union
+from typing import List, Optional, Union
 
+import numpy as np
 import SimpleITK as sitk
 
+from decide.mask._components import component_sizes, select_components
+
+
+def _is_empty(image: sitk.Image) -> bool:
+    """Check whether a mask has no nonzero voxel, stopping at the first one found.
+
+    :param sitk.Image image: The mask.
+    :return bool: True if all voxels are zero.
+    """
+    return not sitk.GetArrayViewFromImage(image).any()
+
+
+def _as_uint8(image: sitk.Image) -> sitk.Image:
+    """Cast an image to UInt8, returning it unchanged if it already is.
+
+    :param sitk.Image image: The image.
+    :return sitk.Image: The UInt8 image.
+    """
+    return image if image.GetPixelID() == sitk.sitkUInt8 else sitk.Cast(image, sitk.sitkUInt8)
+
+
+def _geometry(image: sitk.Image) -> tuple:
+    """Collect the geometry of an image, size first as it is the cheapest to compare and the most likely to differ.
+
+    :param sitk.Image image: The image.
+    :return tuple: Size, spacing, origin and direction.
+    """
+    return image.GetSize(), image.GetSpacing(), image.GetOrigin(), image.GetDirection()
+
+
+def _wrap_like(array: np.ndarray, reference: sitk.Image) -> sitk.Image:
+    """Wrap a result array as an image with the geometry of the reference image.
+
+    :param np.ndarray array: Voxel array in (z, y, x) order.
+    :param sitk.Image reference: Image whose origin, spacing and direction are copied.
+    :return sitk.Image: The image.
+    """
+    image = sitk.GetImageFromArray(array)
+    image.CopyInformation(reference)
+    return image
+
+
+def _load_image(item: Union[str, Path, sitk.Image], description: str) -> sitk.Image:
+    """Return an in-memory image as is, or read it from file.
+
+    :param Union[str, Path, sitk.Image] item: Image or path to an image file.
+    :param str description: Description of the file used in error messages, e.g. "Input file".
+    :raises FileNotFoundError: If the file does not exist.
+    :raises IOError: If the file cannot be read.
+    :return sitk.Image: The image.
+    """
+    if not isinstance(item, (str, Path)):
+        return item
+    if not os.path.exists(item):
+        raise FileNotFoundError(f"{description} not found: {item}")
+    try:
+        return sitk.ReadImage(str(item))
+    except Exception as e:
+        raise IOError(f"Error reading {description.lower()} {item}: {e}")
+
 
 class MaskPostProcessor:
     """Static methods for all mask postprocessing."""
@@ -41,68 +102,63 @@ class MaskPostProcessor:
 
         try:
             # Handle input: either file path or SimpleITK image
-            if isinstance(input_data, (str, Path)):
-                if not os.path.exists(input_data):
-                    raise FileNotFoundError(f"Input file not found: {input_data}")
+            image = _load_image(input_data, "Input file")
 
-                try:
-                    image = sitk.ReadImage(input_data)
-                except Exception as e:
-                    raise IOError(f"Error reading input file: {e}")
-            else:
-                image = input_data
-
-            # Ensure the image is binary
-            binary_check = sitk.BinaryThreshold(
-                image, lowerThreshold=0.5, upperThreshold=1.5, insideValue=1, outsideValue=0
-            )
-            if not sitk.Equal(image, binary_check):
-                image = binary_check
+            # Ensure the image is binary: a UInt8 image whose minimum and maximum are 0 or 1 is used as is
+            min_max = sitk.MinimumMaximumImageFilter()
+            min_max.Execute(image)
+            if (
+                image.GetPixelID() != sitk.sitkUInt8
+                or min_max.GetMinimum() not in (0, 1)
+                or min_max.GetMaximum() not in (0, 1)
+            ):
+                if image.GetPixelID() in (sitk.sitkFloat32, sitk.sitkFloat64):
+                    image = sitk.BinaryThreshold(
+                        image, lowerThreshold=0.5, upperThreshold=1.5, insideValue=1, outsideValue=0
+                    )
+                else:
+                    # Any nonzero voxel of an integer mask is foreground, e.g. 0/255 or a single label value
+                    image = sitk.NotEqual(image, 0)
 
             # Use ConnectedComponent to find isolated regions
-            connected_components = sitk.ConnectedComponent(image)
-
-            # Use LabelShapeStatisticsImageFilter to get volumes
-            label_stats = sitk.LabelShapeStatisticsImageFilter()
-            label_stats.Execute(connected_components)
-
-            # Get all labels and their physical volumes
-            labels = label_stats.GetLabels()
+            component_filter = sitk.ConnectedComponentImageFilter()
+            connected_components = component_filter.Execute(image)
+            num_components = component_filter.GetObjectCount()
 
             # Handle empty mask case
-            if not labels:
+            if not num_components:
                 if output_path:
-                    output_path = Path(output_path)
-                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    if not isinstance(output_path, Path):
+                        output_path = Path(output_path)
+                    output_dir = output_path.parent
+                    output_dir.mkdir(parents=True, exist_ok=True)
 
                     sitk.WriteImage(image, output_path)
                     return None
                 return image
 
-            volumes = [label_stats.GetPhysicalSize(label) for label in labels]
-
-            # Find the largest segment volume
-            max_volume = max(volumes)
-            volume_threshold = max_volume * thr
-
-            # Identify valid labels (those meeting the threshold)
-            valid_labels = [label for label, volume in zip(labels, volumes) if volume >= volume_threshold]
-
-            # Create a binary mask containing only valid segments
-            result_image = sitk.Image(image.GetSize(), sitk.sitkUInt8)
-            result_image.CopyInformation(image)
+            # Voxel count of every component; with a uniform voxel size it ranks them like the physical volume
+            component_array = sitk.GetArrayViewFromImage(connected_components)
+            if component_sizes is not None:
+                voxel_counts = component_sizes(component_array, num_components)
+            else:
+                voxel_counts = np.bincount(component_array.ravel(), minlength=num_components + 1)
+            voxel_counts[0] = 0
 
-            # Add each valid component to the result image
-            for label in valid_labels:
-                # Extract the binary mask for this label
-                label_mask = sitk.Equal(connected_components, label)
-                # Add it to the result
-                result_image = sitk.Or(result_image, label_mask)
+            # Keep the components of at least thr times the largest one's volume
+            lookup = ((voxel_counts >= voxel_counts.max() * thr) & (voxel_counts > 0)).astype(np.uint8)
+            if select_components is not None:
+                result_array = select_components(component_array, lookup)
+            else:
+                result_array = lookup[component_array]
+            result_image = _wrap_like(result_array, image)
 
             # Save or return the result
             if output_path:
-                output_path = Path(output_path)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
+                if not isinstance(output_path, Path):
+                    output_path = Path(output_path)
+                output_dir = output_path.parent
+                output_dir.mkdir(parents=True, exist_ok=True)
 
                 try:
                     sitk.WriteImage(result_image, output_path)
@@ -124,9 +180,8 @@ class MaskPostProcessor:
     def combine_binary_masks(
         input_data: List[Union[sitk.Image, str, Path]],
         output_path: Optional[Union[str, Path]] = None,
-        **kwargs: Dict[str, Any],
     ) -> Optional[sitk.Image]:
-        """Combines multiple binary masks into a single mask using only SimpleITK operations.
+        """Combines multiple binary masks into a single mask with one in-place OR accumulator.
 
         :param List[Union[sitk.Image, str, Path]] input_data: List of binary masks,
         either as paths to .nii.gz files or SimpleITK image objects.
@@ -151,65 +206,46 @@ class MaskPostProcessor:
                 filename = str(item) if isinstance(item, (str, Path)) else f"In-memory image {idx}"
 
                 # Load the image
-                if isinstance(item, (str, Path)):
-                    if not os.path.exists(item):
-                        raise FileNotFoundError(f"Input file not found: {filename}")
-                    try:
-                        image = sitk.ReadImage(str(item))
-                    except Exception as e:
-                        raise IOError(f"Error reading input file {filename}: {e}")
-                else:
-                    image = item
+                image = _load_image(item, "Input file")
 
                 # Store the first image as reference
                 if idx == 0:
                     reference_image = image
-                    # Initialize result as a copy of the first image
-                    result_image = sitk.Cast(image, sitk.sitkUInt8)
+                    reference_geometry = _geometry(image)
+                    # Initialize result as a UInt8 copy of the first image
+                    result_array = sitk.GetArrayViewFromImage(image).astype(np.uint8)
 
                     # Skip empty first image
-                    stats = sitk.StatisticsImageFilter()
-                    stats.Execute(image)
-                    if stats.GetSum() == 0:
+                    if _is_empty(image):
                         warnings.warn(f"First mask {filename} is empty. Skipping this mask.")
-                        continue
 
                     continue
 
                 # Ensure consistent dimensions with reference image
-                if (
-                    image.GetSize() != reference_image.GetSize()
-                    or image.GetSpacing() != reference_image.GetSpacing()
-                    or image.GetOrigin() != reference_image.GetOrigin()
-                    or image.GetDirection() != reference_image.GetDirection()
-                ):
+                if _geometry(image) != reference_geometry:
                     raise RuntimeError(
                         f"Image {filename} has inconsistent dimensions or metadata compared to the reference image."
                     )
 
                 # Skip empty masks
-                stats = sitk.StatisticsImageFilter()
-                stats.Execute(image)
-                if stats.GetSum() == 0:
+                if _is_empty(image):
                     warnings.warn(f"Mask {filename} is empty. Skipping this mask.")
                     continue
 
-                # Combine with result using OR operation
-                result_image = sitk.Or(result_image, sitk.Cast(image, sitk.sitkUInt8))
-
-            # Check if we have a valid result (we might not if all masks were empty)
-            if "result_image" not in locals():
-                warnings.warn("All provided masks were empty. Creating an empty mask.")
-                result_image = sitk.Image(reference_image.GetSize(), sitk.sitkUInt8)
-                result_image.CopyInformation(reference_image)
+                # Combine with result using OR operation, in place
+                # Other pixel types are cast to UInt8 chunk-wise inside the ufunc, without a full-size temporary
+                array = sitk.GetArrayViewFromImage(image)
+                np.bitwise_or(result_array, array, out=result_array, dtype=np.uint8, casting="unsafe")
 
             # Make sure we preserve all metadata from the original reference image
-            result_image.CopyInformation(reference_image)
+            result_image = _wrap_like(result_array, reference_image)
 
             # Save or return the result
             if output_path:
-                output_path = Path(output_path)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
+                if not isinstance(output_path, Path):
+                    output_path = Path(output_path)
+                output_dir = output_path.parent
+                output_dir.mkdir(parents=True, exist_ok=True)
 
                 try:
                     # Ensure we're saving with the correct compression and format
@@ -229,7 +265,6 @@ class MaskPostProcessor:
         mask_1: Union[sitk.Image, str, Path],
         mask_2: Union[sitk.Image, str, Path],
         output_path: Optional[Union[str, Path]] = None,
-        **kwargs: Dict[str, Any],
     ) -> Optional[sitk.Image]:
         """Remove the overlapping parts from mask_1 that overlap with mask_2.
 
@@ -251,61 +286,46 @@ class MaskPostProcessor:
             mask_2_name = str(mask_2) if isinstance(mask_2, (str, Path)) else "Second in-memory image"
 
             # Load the binary masks if they are given as paths
-            if isinstance(mask_1, (str, Path)):
-                if not os.path.exists(mask_1):
-                    raise FileNotFoundError(f"First mask file not found: {mask_1_name}")
-                try:
-                    mask_1 = sitk.ReadImage(str(mask_1))
-                except Exception as e:
-                    raise IOError(f"Error reading first mask file {mask_1_name}: {e}")
-
-            if isinstance(mask_2, (str, Path)):
-                if not os.path.exists(mask_2):
-                    raise FileNotFoundError(f"Second mask file not found: {mask_2_name}")
-                try:
-                    mask_2 = sitk.ReadImage(str(mask_2))
-                except Exception as e:
-                    raise IOError(f"Error reading second mask file {mask_2_name}: {e}")
+            mask_1 = _load_image(mask_1, "First mask file")
+            mask_2 = _load_image(mask_2, "Second mask file")
 
             # Ensure consistent dimensions and metadata
-            if (
-                mask_1.GetSize() != mask_2.GetSize()
-                or mask_1.GetSpacing() != mask_2.GetSpacing()
-                or mask_1.GetOrigin() != mask_2.GetOrigin()
-                or mask_1.GetDirection() != mask_2.GetDirection()
-            ):
+            if _geometry(mask_1) != _geometry(mask_2):
                 raise RuntimeError(
                     f"Input masks have inconsistent dimensions or metadata: {mask_1_name} vs {mask_2_name}"
                 )
 
             # Cast to UInt8 for consistency but don't apply thresholding
-            mask_1_uint8 = sitk.Cast(mask_1, sitk.sitkUInt8)
-            mask_2_uint8 = sitk.Cast(mask_2, sitk.sitkUInt8)
+            mask_1_uint8 = _as_uint8(mask_1)
+            mask_2_uint8 = _as_uint8(mask_2)
 
             # Check if either mask is empty
-            stats_1 = sitk.StatisticsImageFilter()
-            stats_1.Execute(mask_1_uint8)
-            if stats_1.GetSum() == 0:
+            if _is_empty(mask_1_uint8):
                 warnings.warn(f"First mask {mask_1_name} is empty. Result will be empty.")
 
-            stats_2 = sitk.StatisticsImageFilter()
-            stats_2.Execute(mask_2_uint8)
-            if stats_2.GetSum() == 0:
+            if _is_empty(mask_2_uint8):
                 warnings.warn(f"Second mask {mask_2_name} is empty. Result will be identical to first mask.")
                 result_mask = mask_1_uint8
             else:
                 # Remove the parts from mask_1 that overlap with mask_2
-                # Invert mask_2 and perform logical AND
-                inverted_mask_2 = sitk.BinaryNot(mask_2_uint8)
-                result_mask = sitk.And(mask_1_uint8, inverted_mask_2)
+                # AND mask_1 with the inverse of mask_2 (1 where mask_2 is not 1, as sitk.BinaryNot) in one pass
+                # The comparison and the AND share one output buffer
+                array_1 = sitk.GetArrayViewFromImage(mask_1_uint8)
+                array_2 = sitk.GetArrayViewFromImage(mask_2_uint8)
+                result_array = np.empty_like(array_1)
+                np.not_equal(array_2, 1, out=result_array.view(bool))
+                np.bitwise_and(array_1, result_array, out=result_array)
+                result_mask = _wrap_like(result_array, mask_1)
 
             # Copy metadata from mask_1 to result_mask
             result_mask.CopyInformation(mask_1)
 
             # Save the result if output_path is provided, else return the result
             if output_path:
-                output_path = Path(output_path)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
+                if not isinstance(output_path, Path):
+                    output_path = Path(output_path)
+                output_dir = output_path.parent
+                output_dir.mkdir(parents=True, exist_ok=True)
 
                 try:
                     sitk.WriteImage(result_mask, str(output_path), True)  # Enable compression
@@ -1,9 +1,13 @@
 """Module for Autosegmentation of Thoracic Structures."""
 
+import gzip
 import logging
 import os
+import shutil
 import subprocess
+import tempfile
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Union
 
@@ -13,7 +17,6 @@ from platipy.imaging.projects.cardiac.run import run_hybrid_segmentation
 from totalsegmentator.python_api import totalsegmentator
 
 from decide.paths import CONFIG_DIR
-from decide.utils.logger import setup_logger
 
 
 class ImageSegmentator(ABC):
@@ -41,9 +44,9 @@ class TSModel(ImageSegmentator):
 
         :param Union[List[str], str, Path] ts_configuration: List of ROI names or path to YAML config file.
         defaults to CONFIG_DIR/"config_total_segmentator.yaml"
-        :param logging.Logger logger: Optional logger object, defaults to a new logger with INFO level.
+        :param logging.Logger logger: Optional logger object, defaults to the module logger.
         """
-        self.logger = logger or setup_logger(level=logging.INFO)
+        self.logger = logger or logging.getLogger(__name__)
 
         self.roi_subset = None
         if ts_configuration:
@@ -68,6 +71,11 @@ class TSModel(ImageSegmentator):
     def run_segmentator(self, nifti_image: Union[str, Path], output_dir: Union[str, Path]) -> None:
         """Run TotalSegmentator on the given image with multiple tasks.
 
+        The heartchambers_highres, body and total tasks are independent and each writes into its own temporary
+        directory. They run one after another; set DECIDE_SEG_PARALLEL=1 to run them concurrently, which needs about
+        three times the GPU memory and a warm TotalSegmentator setup (weights downloaded, license set).
+        A compressed input is decompressed once and all tasks read the uncompressed copy.
+
         :param Union[str, Path] nifti_image:  Path to the input NIfTI image.
         :param Union[str, Path] output_dir: Directory to save the segmentation output.
         """
@@ -75,27 +83,55 @@ class TSModel(ImageSegmentator):
         output_dir = str(output_dir)
         os.makedirs(output_dir, exist_ok=True)
 
-        # Run high-resolution heart segmentation
-        self.logger.info("Running Heartchambers Highres Segmentation")
-        totalsegmentator(nifti_image, output_dir, quiet=True, task="heartchambers_highres")
-
-        # Rename heart segmentation outputs and delete heart_aorta.nii.gz
-        self.logger.info("Renaming heartchambers_highres outputs with prefix heart_ & removing aorta")
-        for file in os.listdir(output_dir):
-            file_path = os.path.join(output_dir, file)
-            if file == "aorta.nii.gz":
-                os.remove(file_path)
-            elif not file.startswith("heart_"):
-                new_path = os.path.join(output_dir, f"heart_{file}")
-                os.rename(file_path, new_path)
-
-        # Run whole-body segmentation
-        self.logger.info("Running Body Segmentation")
-        totalsegmentator(nifti_image, output_dir, quiet=True, task="body")
-
-        # Run default segmentation with optional ROI subset
-        self.logger.info("Running 'total' Segmentation")
-        totalsegmentator(nifti_image, output_dir, quiet=True, roi_subset=self.roi_subset)
+        tasks = [
+            ("Heartchambers Highres", {"task": "heartchambers_highres"}),
+            ("Body", {"task": "body"}),
+            ("'total'", {"roi_subset": self.roi_subset}),
+        ]
+        parallel = os.getenv("DECIDE_SEG_PARALLEL", "0") in {"1", "true", "True"}
+
+        with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+            if nifti_image.endswith(".nii.gz"):
+                uncompressed_image = os.path.join(tmp_dir, "input.nii")
+                with gzip.open(nifti_image, "rb") as src, open(uncompressed_image, "wb") as dst:
+                    shutil.copyfileobj(src, dst, length=1 << 20)
+                nifti_image = uncompressed_image
+
+            task_dirs = [os.path.join(tmp_dir, str(idx)) for idx in range(len(tasks))]
+            with ThreadPoolExecutor(max_workers=len(tasks) if parallel else 1) as executor:
+                futures = [
+                    executor.submit(self._run_task, name, nifti_image, task_dir, task_options)
+                    for (name, task_options), task_dir in zip(tasks, task_dirs)
+                ]
+                for future in futures:
+                    future.result()
+
+            # Move heart segmentation outputs with prefix heart_, dropping heart_aorta.nii.gz
+            self.logger.info("Renaming heartchambers_highres outputs with prefix heart_ & removing aorta")
+            heart_dir, *other_dirs = task_dirs
+            with os.scandir(heart_dir) as entries:
+                for entry in entries:
+                    if entry.name == "aorta.nii.gz":
+                        continue
+                    new_name = entry.name if entry.name.startswith("heart_") else f"heart_{entry.name}"
+                    os.replace(entry.path, os.path.join(output_dir, new_name))
+
+            # Move body and 'total' outputs, in the order the tasks would have written them
+            for task_dir in other_dirs:
+                with os.scandir(task_dir) as entries:
+                    for entry in entries:
+                        os.replace(entry.path, os.path.join(output_dir, entry.name))
+
+    def _run_task(self, name: str, nifti_image: str, task_dir: str, task_options: dict) -> None:
+        """Run one TotalSegmentator task, logging when it actually starts.
+
+        :param str name: Task name for the log.
+        :param str nifti_image: Path to the input NIfTI image.
+        :param str task_dir: Output directory of the task.
+        :param dict task_options: Keyword arguments for ``totalsegmentator``.
+        """
+        self.logger.info(f"Running {name} Segmentation")
+        totalsegmentator(nifti_image, task_dir, quiet=True, **task_options)
 
 
 class PlatityModel(ImageSegmentator):
@@ -104,10 +140,10 @@ class PlatityModel(ImageSegmentator):
     def __init__(self, logger: logging.Logger = None):
         """The PlatiPy model.
 
-        :param logging.Logger logger: Optional logger object, defaults to a new logger with INFO level.
+        :param logging.Logger logger: Optional logger object, defaults to the module logger.
         """
         super().__init__()
-        self.logger = logger or setup_logger(level=logging.INFO)
+        self.logger = logger or logging.getLogger(__name__)
 
     def run_segmentator(self, nifti_image: Union[str, Path], output_dir: Union[str, Path]) -> None:
         """Run Platipy's hybrid cardiac segmentation on the input image.
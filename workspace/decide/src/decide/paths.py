@@ -5,10 +5,12 @@ from __future__ import annotations
 
 import os
 import sysconfig
+from functools import lru_cache
 from pathlib import Path
 
 # Markers that typically indicate the project/repo root
 _PROJECT_MARKERS = ("pyproject.toml", ".git", ".hg")
+_PROJECT_MARKERS_SET = frozenset(_PROJECT_MARKERS)
 
 
 def _is_within_site_packages(path: Path) -> bool:
@@ -28,18 +30,28 @@ def _is_within_site_packages(path: Path) -> bool:
     return False
 
 
+def _has_project_marker(directory: Path) -> bool:
+    # One directory listing instead of a stat per marker; stops at the first marker found
+    try:
+        with os.scandir(directory) as entries:
+            return any(entry.name in _PROJECT_MARKERS_SET for entry in entries)
+    except OSError:
+        return False
+
+
+@lru_cache(maxsize=1)
 def _find_project_root(start: Path | None = None) -> Path:
     here = Path(start or __file__).resolve()
     if here.is_file():
         here = here.parent
 
     for parent in (here, *here.parents):
-        if any((parent / m).exists() for m in _PROJECT_MARKERS):
+        if _has_project_marker(parent):
             return parent
 
     # Fallback: if the current working directory looks like a project, use it
     cwd = Path.cwd()
-    if any((cwd / m).exists() for m in _PROJECT_MARKERS):
+    if _has_project_marker(cwd):
         return cwd
 
     # Last resort: use CWD
@@ -56,17 +68,40 @@ else:
     PROJECT_ROOT = _detected_root
 
 # --- Public paths (always anchored to the project directory) ---
-CONFIG_DIR = PROJECT_ROOT / "config"
-LOG_DIR = PROJECT_ROOT / "logs"
-TEST_DATA_DIR = PROJECT_ROOT / "data"
+# Resolved lazily through the module ``__getattr__`` below, so a directory is only created when it is first used.
+CONFIG_DIR: Path
+LOG_DIR: Path
+TEST_DATA_DIR: Path
 
+_PROJECT_DIRS = {
+    "CONFIG_DIR": PROJECT_ROOT / "config",
+    "LOG_DIR": PROJECT_ROOT / "logs",
+    "TEST_DATA_DIR": PROJECT_ROOT / "data",
+}
 
-def ensure_project_dirs() -> None:
-    """Create CONFIG_DIR, LOG_DIR, and TEST_DATA_DIR if they do not exist. Safe to call multiple times."""
-    for d in (CONFIG_DIR, LOG_DIR, TEST_DATA_DIR):
-        d.mkdir(parents=True, exist_ok=True)
+# By default, auto-create on first use. You can opt-out by setting DECIDE_AUTO_CREATE_DIRS=0
+_AUTO_CREATE_DIRS = os.getenv("DECIDE_AUTO_CREATE_DIRS", "1") not in {"0", "false", "False"}
 
 
-# By default, auto-create on import. You can opt-out by setting DECIDE_AUTO_CREATE_DIRS=0
-if os.getenv("DECIDE_AUTO_CREATE_DIRS", "1") not in {"0", "false", "False"}:
-    ensure_project_dirs()
+def _ensure_dir(directory: Path) -> None:
+    # A single stat when the directory already exists, instead of the makedirs walk
+    if not os.path.isdir(directory):
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+def ensure_project_dirs() -> None:
+    """Create CONFIG_DIR, LOG_DIR, and TEST_DATA_DIR if they do not exist. Safe to call multiple times."""
+    for d in _PROJECT_DIRS.values():
+        _ensure_dir(d)
+
+
+def __getattr__(name: str) -> Path:
+    try:
+        directory = _PROJECT_DIRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    if _AUTO_CREATE_DIRS:
+        _ensure_dir(directory)
+    # Bind it as a module attribute, so later lookups no longer reach __getattr__
+    globals()[name] = directory
+    return directory
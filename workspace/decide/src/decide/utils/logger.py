@@ -1,12 +1,14 @@
 """Logger Module."""
 
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional, Union
 
-from decide.paths import LOG_DIR
+from decide import paths
 
 
 def setup_logger(
@@ -41,9 +43,27 @@ def setup_logger(
             file_handler = RotatingFileHandler(str(log_file), maxBytes=5_000_000, backupCount=5)
             file_handler.setLevel(level)
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+
+            # Writing and rotating the file happens on the listener thread, not on the thread that logs
+            log_queue = queue.Queue(-1)
+            listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.setLevel(level)
+            logger.addHandler(queue_handler)
 
     return logger
 
 
-logger = setup_logger("DECIDE", LOG_DIR / "decide.log")
+def configure_logging(log_file: Optional[Union[str, Path]] = None, level: int = logging.DEBUG) -> logging.Logger:
+    """Configure the package logger "decide" once, from the application entry point.
+
+    Library modules log through ``logging.getLogger(__name__)``, which propagates to this logger.
+
+    :param Optional[Union[str, Path]] log_file: Log file, defaults to LOG_DIR/"decide.log"
+    :param int level: Logging Level, defaults to logging.DEBUG
+    :return logging.Logger: The logger Object.
+    """
+    return setup_logger("decide", log_file or paths.LOG_DIR / "decide.log", level)
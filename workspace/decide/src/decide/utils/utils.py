@@ -3,15 +3,26 @@
 import logging
 import os
 import shutil
+import stat
 import zipfile
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import Callable, List, Set, Tuple, Union
 
 import numpy as np
 import SimpleITK as sitk
 
+try:
+    import cc3d
+except ImportError:  # optional, see the "fast" extra
+    cc3d = None
+
 from decide.utils.logger import setup_logger
 
+# Already compressed formats, stored as is instead of being deflated again
+_COMPRESSED_SUFFIXES = {".gz", ".zip", ".jp2", ".j2k", ".png", ".jpg", ".jpeg"}
+
 
 def generate_tree(target_dir: str, prefix: str = "", ignore: List = ["__pycache__"]) -> str:
     """Get the structure of a directory as a tree.
@@ -21,21 +32,27 @@ def generate_tree(target_dir: str, prefix: str = "", ignore: List = ["__pycache_
     :param List ignore: Items to ignore, defaults to ["__pycache__"]
     :return str: The structure of a directory as a tree.
     """
-    tree = ""
-    contents = os.listdir(target_dir)
-    for not_needed in ignore:
-        if not_needed in contents:
-            contents.remove(not_needed)
-    pointers = ["├── "] * (len(contents) - 1) + ["└── "]
+    lines = []
+    _tree_lines(target_dir, prefix, set(ignore), lines)
+    return "".join(lines)
+
 
-    for pointer, item in zip(pointers, contents):
-        item_path = os.path.join(target_dir, item)
-        tree += prefix + pointer + item + "\n"
-        if os.path.isdir(item_path):
-            extension = "│   " if pointer == "├── " else "    "
-            tree += generate_tree(item_path, prefix + extension)
+def _tree_lines(target_dir: str, prefix: str, ignore: Set[str], lines: List[str]) -> None:
+    """Append the tree lines of a directory, listing it once with the type of each entry.
+
+    :param str target_dir: The target directory.
+    :param str prefix: Prefix for name in the tree.
+    :param Set[str] ignore: Names to ignore.
+    :param List[str] lines: Lines of the tree, extended in place.
+    """
+    with os.scandir(target_dir) as it:
+        entries = sorted((entry for entry in it if entry.name not in ignore), key=lambda entry: entry.name)
 
-    return tree
+    for idx, entry in enumerate(entries):
+        last = idx == len(entries) - 1
+        lines.append(prefix + ("└── " if last else "├── ") + entry.name + "\n")
+        if entry.is_dir():
+            _tree_lines(entry.path, prefix + ("    " if last else "│   "), ignore, lines)
 
 
 def zip_files(filepaths: List, output_zip: str, logger: logging.Logger = None) -> bool:
@@ -50,12 +67,15 @@ def zip_files(filepaths: List, output_zip: str, logger: logging.Logger = None) -
     len_filepaths = len(filepaths)
     if len_filepaths:
         logger.info(f"Zipping {len_filepaths} files")
-        with zipfile.ZipFile(output_zip, "w", zipfile.ZIP_DEFLATED) as zipf:
+        with zipfile.ZipFile(output_zip, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
             for filepath in filepaths:
                 filepath = Path(filepath)
                 if filepath.exists():
                     arcname = filepath.name
-                    zipf.write(filepath, arcname)
+                    if filepath.suffix.lower() in _COMPRESSED_SUFFIXES:
+                        zipf.write(filepath, arcname, compress_type=zipfile.ZIP_STORED)
+                    else:
+                        zipf.write(filepath, arcname)
                 else:
                     logger.warning(f"File not found - {filepath}")
         return True
@@ -77,11 +97,11 @@ def calculate_volume(image: Union[sitk.Image, str]) -> float:
     # Get the voxel size (in mm^3)
     voxel_size = np.prod(image.GetSpacing())
 
-    # Convert the image to a numpy array
-    data = sitk.GetArrayFromImage(image)
+    # Read the voxels through a view, without copying them
+    data = sitk.GetArrayViewFromImage(image)
 
     # Calculate the total volume (in mm^3)
-    total_volume = np.sum(data) * voxel_size
+    total_volume = np.count_nonzero(data) * voxel_size
 
     return total_volume
 
@@ -89,6 +109,8 @@ def calculate_volume(image: Union[sitk.Image, str]) -> float:
 def get_component_count(image: Union[sitk.Image, str, Path]) -> Tuple[int, List[float]]:
     """Count the number of connected components in a binary image and return their physical sizes.
 
+    Uses the faster ``cc3d`` labelling when the optional package is installed (see the "fast" extra).
+
     :param Union[sitk.Image, str, Path] image: The input image, path to the NIfTI file as string, or Path object.
     :return Tuple[int, List[float]]: A tuple containing:
         - The number of connected components in the image
@@ -98,6 +120,14 @@ def get_component_count(image: Union[sitk.Image, str, Path]) -> Tuple[int, List[
     if isinstance(image, (str, Path)):
         image = sitk.ReadImage(str(image))
 
+    if cc3d is not None:
+        # Face connectivity and any nonzero voxel as foreground, as sitk.ConnectedComponent
+        data = sitk.GetArrayViewFromImage(image) != 0
+        labels, num_components = cc3d.connected_components(data, connectivity=6 if data.ndim == 3 else 4, return_N=True)
+        counts = np.bincount(labels.ravel(), minlength=num_components + 1)[1:]
+        voxel_size = float(np.prod(image.GetSpacing()))
+        return (int(num_components), [round(float(count) * voxel_size, 1) for count in counts])
+
     # Perform connected component analysis
     connected_components = sitk.ConnectedComponent(image)
 
@@ -115,65 +145,117 @@ def get_component_count(image: Union[sitk.Image, str, Path]) -> Tuple[int, List[
     return (len(labels), physical_sizes)
 
 
-def move_files_to_directory(files: List[Union[str, Path]], dest_dir: Union[str, Path]) -> None:
-    """
-    Move specified files to a destination directory using shutil.move.
+def _transfer_files(
+    files: List[Union[str, Path]],
+    dest_dir: Union[str, Path],
+    transfer: Callable[[Path, Path], object],
+    verb: str,
+    max_workers: int,
+) -> None:
+    """Transfer files into an empty destination directory, validating every source before the first transfer.
 
-    :param files: List of file paths to move.
-    :param dest_dir: Destination directory path.
+    A failing transfer stops the transfers that have not started yet, but the files already transferred stay in the
+    destination directory, with concurrent transfers too.
+
+    :param List[Union[str, Path]] files: List of file paths.
+    :param Union[str, Path] dest_dir: Destination directory path.
+    :param Callable[[Path, Path], object] transfer: Function transferring one file to its target path.
+    :param str verb: Name of the operation used in error messages, e.g. "copy".
+    :param int max_workers: Number of concurrent transfers, 1 transfers the files one after the other.
     :raises FileExistsError: If the destination directory is not empty.
     :raises FileNotFoundError: If a file does not exist.
     :raises ValueError: If a path is not a file.
-    :raises OSError: If the move operation fails.
+    :raises OSError: If a transfer fails.
     """
     dest_path = Path(dest_dir)
     dest_path.mkdir(parents=True, exist_ok=True)
 
     # Raise if destination directory is not empty
-    if any(dest_path.iterdir()):
-        raise FileExistsError(f"Destination directory '{dest_path}' is not empty.")
+    with os.scandir(dest_path) as it:
+        if next(it, None) is not None:
+            raise FileExistsError(f"Destination directory '{dest_path}' is not empty.")
 
+    pairs = []
     for file in files:
-        file_path = Path(file)
-        if not file_path.exists():
+        file_path = file if isinstance(file, Path) else Path(file)
+        try:
+            mode = os.stat(file_path).st_mode
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
-        if not file_path.is_file():
+        if not stat.S_ISREG(mode):
             raise ValueError(f"Not a file: {file_path}")
+        pairs.append((file_path, dest_path / file_path.name))
 
-        target_path = dest_path / file_path.name
+    def transfer_one(pair: Tuple[Path, Path]) -> None:
+        file_path, target_path = pair
         try:
-            shutil.move(str(file_path), str(target_path))
+            transfer(file_path, target_path)
         except OSError as e:
-            raise OSError(f"Failed to move {file_path} to {target_path}: {e}")
+            raise OSError(f"Failed to {verb} {file_path} to {target_path}: {e}")
+
+    if max_workers > 1 and len(pairs) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(transfer_one, pair) for pair in pairs]
+            # On the first failure, drop the transfers that have not started, like the sequential loop
+            wait(futures, return_when=FIRST_EXCEPTION)
+            for future in futures:
+                future.cancel()
+            for future in futures:
+                if not future.cancelled():
+                    future.result()
+    else:
+        for pair in pairs:
+            transfer_one(pair)
 
 
-def copy_files_to_directory(files: List[Union[str, Path]], dest_dir: Union[str, Path]) -> None:
+def _copy_file(file_path: Path, target_path: Path, *, preserve_metadata: bool) -> None:
+    """Copy one file, with its permission bits and timestamps if asked.
+
+    :param Path file_path: Source file.
+    :param Path target_path: Target file.
+    :param bool preserve_metadata: Also copy permission bits and timestamps.
     """
-    Copy specified files to a destination directory using shutil.copy2.
+    shutil.copyfile(file_path, target_path)
+    if preserve_metadata:
+        shutil.copystat(file_path, target_path)
 
-    :param files: List of file paths to copy.
+
+def move_files_to_directory(files: List[Union[str, Path]], dest_dir: Union[str, Path], max_workers: int = 1) -> None:
+    """
+    Move specified files to a destination directory using shutil.move.
+
+    :param files: List of file paths to move.
     :param dest_dir: Destination directory path.
+    :param max_workers: Number of concurrent moves, worthwhile for moves across devices on SSD or network storage,
+        defaults to 1
     :raises FileExistsError: If the destination directory is not empty.
     :raises FileNotFoundError: If a file does not exist.
     :raises ValueError: If a path is not a file.
-    :raises OSError: If the copy operation fails.
+    :raises OSError: If the move operation fails. The files moved before the failure stay in dest_dir.
     """
-    dest_path = Path(dest_dir)
-    dest_path.mkdir(parents=True, exist_ok=True)
+    _transfer_files(files, dest_dir, lambda src, dst: shutil.move(str(src), str(dst)), "move", max_workers)
 
-    # Raise if destination directory is not empty
-    if any(dest_path.iterdir()):
-        raise FileExistsError(f"Destination directory '{dest_path}' is not empty.")
 
-    for file in files:
-        file_path = Path(file)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-        if not file_path.is_file():
-            raise ValueError(f"Not a file: {file_path}")
+def copy_files_to_directory(
+    files: List[Union[str, Path]],
+    dest_dir: Union[str, Path],
+    max_workers: int = 1,
+    *,
+    preserve_metadata: bool = False,
+) -> None:
+    """
+    Copy specified files to a destination directory using shutil.copyfile.
 
-        target_path = dest_path / file_path.name
-        try:
-            shutil.copy2(file_path, target_path)
-        except OSError as e:
-            raise OSError(f"Failed to copy {file_path} to {target_path}: {e}")
+    shutil.copyfile copies in the kernel where the platform allows it (sendfile or copy_file_range on Linux).
+
+    :param files: List of file paths to copy.
+    :param dest_dir: Destination directory path.
+    :param max_workers: Number of concurrent copies, worthwhile on SSD or network storage but not on a single hard
+        disk, defaults to 1
+    :param preserve_metadata: Also copy permission bits and timestamps, as shutil.copy2, defaults to False
+    :raises FileExistsError: If the destination directory is not empty.
+    :raises FileNotFoundError: If a file does not exist.
+    :raises ValueError: If a path is not a file.
+    :raises OSError: If the copy operation fails. The files copied before the failure stay in dest_dir.
+    """
+    _transfer_files(files, dest_dir, partial(_copy_file, preserve_metadata=preserve_metadata), "copy", max_workers)
@@ -1,6 +1,7 @@
 """Modeule for redereing 3D Binary (0|1) using matplotlib."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Literal, Optional, Tuple, Union
 
@@ -8,6 +9,32 @@ import matplotlib.pyplot as plt
 import numpy as np
 import SimpleITK as sitk
 
+_BACKGROUND_COLORS = {
+    "black": (0.0, 0.0, 0.0),
+    "white": (1.0, 1.0, 1.0),
+    "grey": (0.5, 0.5, 0.5),
+    "gray": (0.5, 0.5, 0.5),
+}
+
+# Ray casting configuration per view direction; the image rows follow ax1 and the columns ax2
+_VIEW_CONFIGS = {
+    "anterior": {"ray_axis": 1, "ax1": 2, "ax2": 0, "forward": True},
+    "posterior": {"ray_axis": 1, "ax1": 2, "ax2": 0, "forward": False},
+    "right": {"ray_axis": 0, "ax1": 2, "ax2": 1, "forward": True},
+    "left": {"ray_axis": 0, "ax1": 2, "ax2": 1, "forward": False},
+    "superior": {"ray_axis": 2, "ax1": 1, "ax2": 0, "forward": False},
+    "inferior": {"ray_axis": 2, "ax1": 1, "ax2": 0, "forward": True},
+}
+
+_LIGHT_DIRECTIONS = {
+    "anterior": (0.3, 0.7, 0.3),
+    "posterior": (0.3, -0.7, 0.3),
+    "right": (0.7, 0.3, 0.3),
+    "left": (-0.7, 0.3, 0.3),
+    "superior": (0.3, 0.3, 0.7),
+    "inferior": (0.3, 0.3, -0.7),
+}
+
 
 class MaskRenderer3D:
     """Renders 3D binary masks using ray casting and 2D matplotlib.
@@ -54,12 +81,17 @@ class MaskRenderer3D:
 
         self.masks = masks
         self.mask_arrays = []
+        self._hit_arrays = []
+        self._scratch = {}
 
         # Process all masks
         for idx, mask in enumerate(masks):
-            # Convert to numpy array and transpose from (Z, Y, X) to (X, Y, Z)
-            mask_array = sitk.GetArrayFromImage(mask)
-            mask_array = np.ascontiguousarray(np.transpose(mask_array, (2, 1, 0)))
+            # Foreground voxels in the native (Z, Y, X) order, shared by all view directions
+            hit_array = sitk.GetArrayViewFromImage(mask) > 0
+            self._hit_arrays.append(hit_array)
+
+            # The same voxels as a 0/1 mask in (X, Y, Z) order: a transposed view, not a copy
+            mask_array = hit_array.view(np.uint8).T
             self.mask_arrays.append(mask_array)
 
             # Get spacing and shape from first mask (assume all have same spacing)
@@ -67,7 +99,7 @@ class MaskRenderer3D:
                 self.spacing = mask.GetSpacing()
                 self.shape = mask_array.shape
 
-            self.logger.info(f"Mask {idx}: shape {mask_array.shape}, non-zero voxels: {np.sum(mask_array > 0)}")
+            self.logger.info(f"Mask {idx}: shape {mask_array.shape}, non-zero voxels: {np.count_nonzero(hit_array)}")
 
         self.logger.info(f"Spacing (X, Y, Z): {self.spacing}")
 
@@ -90,6 +122,7 @@ class MaskRenderer3D:
         aspect_correct: bool = True,
         show_bounds: bool = True,
         save_path: Optional[Union[str, Path]] = None,
+        max_workers: int = 1,
     ) -> Union[plt.Figure, list[plt.Figure]]:
         """Render the mask(s) from one or multiple viewing directions.
 
@@ -111,6 +144,8 @@ class MaskRenderer3D:
         :param bool show_bounds: If True, draw bounding box of the image volume, defaults to True
         :param Optional[Union[str, Path]] save_path: If provided, save the figure(s) to this path.
         For multiple directions,will append direction name to filename (e.g., "output_anterior.png"), defaults to None
+        :param int max_workers: Threads that ray cast the directions, defaults to 1.
+        Opposite directions share their buffers, so at most three threads are used.
         :return Union[plt.Figure, list[plt.Figure]]: matplotlib Figure object or
         list of Figure objects (if multiple directions)
         """
@@ -131,17 +166,19 @@ class MaskRenderer3D:
                 for i in range(len(mask_colors), len(self.mask_arrays))
             ]
 
+        images = self._render_images(
+            directions, light_direction, ambient, diffuse, background_color, mask_colors, max_workers
+        )
+
+        # Figures are built on the calling thread, pyplot is not thread-safe
         figures = []
-        for direction in directions:
+        for direction, image in zip(directions, images):
             fig = self._render_single_direction(
                 direction=direction,
-                light_direction=light_direction,
-                ambient=ambient,
-                diffuse=diffuse,
+                image=image,
                 figsize=figsize,
                 dpi=dpi,
                 background_color=background_color,
-                mask_colors=mask_colors,
                 bound_color=bound_color,
                 bound_alpha=bound_alpha,
                 save_path=save_path,
@@ -153,25 +190,45 @@ class MaskRenderer3D:
 
         return figures[0] if return_single else figures
 
-    def _render_single_direction(
+    def _render_images(
+        self,
+        directions: list[str],
+        light_direction: Optional[Tuple[float, float, float]],
+        ambient: float,
+        diffuse: float,
+        background_color: Union[str, Tuple[float, float, float]],
+        mask_colors: list[Tuple[float, float, float]],
+        max_workers: int,
+    ) -> list[np.ndarray]:
+        """Render the RGB image of every direction, grouping directions that share scratch buffers per thread."""
+        render_args = (light_direction, ambient, diffuse, background_color, mask_colors)
+        if max_workers <= 1:
+            return [self._render_image(direction, *render_args) for direction in directions]
+
+        groups = {}
+        for idx, direction in enumerate(directions):
+            groups.setdefault(self._get_view_config(direction)["ray_axis"], []).append(idx)
+
+        def render_group(indices: list[int]) -> list[np.ndarray]:
+            return [self._render_image(directions[idx], *render_args) for idx in indices]
+
+        images = [None] * len(directions)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+            for indices, group_images in zip(groups.values(), executor.map(render_group, groups.values())):
+                for idx, image in zip(indices, group_images):
+                    images[idx] = image
+        return images
+
+    def _render_image(
         self,
         direction: str,
         light_direction: Optional[Tuple[float, float, float]],
         ambient: float,
         diffuse: float,
-        figsize: Optional[Tuple[float, float]],
-        dpi: int,
         background_color: Union[str, Tuple[float, float, float]],
         mask_colors: list[Tuple[float, float, float]],
-        bound_color: Tuple[float, float, float],
-        bound_alpha: float,
-        save_path: Optional[Union[str, Path]],
-        *,
-        aspect_correct: bool,
-        show_bounds: bool,
-        multiple_directions: bool,
-    ) -> plt.Figure:
-        """Render a single direction."""
+    ) -> np.ndarray:
+        """Ray cast and shade a single direction into an RGB image."""
         self.logger.info(f"Rendering from {direction} direction...")
 
         # Set default light direction for this view
@@ -186,15 +243,15 @@ class MaskRenderer3D:
         proj_shape = (self.shape[view_config["ax1"]], self.shape[view_config["ax2"]])
 
         # Ray cast all masks
-        all_depths, all_normals, all_valid_masks = self._ray_cast_all_masks(direction)
+        all_depths, all_normals, all_valid_masks = self._ray_cast_all_masks(direction, proj_shape)
 
         # Determine frontmost surface at each pixel
         frontmost_mask, frontmost_depth, frontmost_normal = self._compute_frontmost_surfaces(
-            all_depths, all_normals, all_valid_masks, proj_shape
+            all_depths, all_normals, all_valid_masks
         )
 
         # Render the final image
-        final_image = self._render_final_image(
+        return self._render_final_image(
             frontmost_mask,
             frontmost_depth,
             frontmost_normal,
@@ -205,9 +262,25 @@ class MaskRenderer3D:
             background_color,
         )
 
+    def _render_single_direction(
+        self,
+        direction: str,
+        image: np.ndarray,
+        figsize: Optional[Tuple[float, float]],
+        dpi: int,
+        background_color: Union[str, Tuple[float, float, float]],
+        bound_color: Tuple[float, float, float],
+        bound_alpha: float,
+        save_path: Optional[Union[str, Path]],
+        *,
+        aspect_correct: bool,
+        show_bounds: bool,
+        multiple_directions: bool,
+    ) -> plt.Figure:
+        """Create, and optionally save, the figure of a single rendered direction."""
         # Create figure
         fig = self._create_figure(
-            image=final_image,
+            image=image,
             direction=direction,
             figsize=figsize,
             dpi=dpi,
@@ -233,9 +306,10 @@ class MaskRenderer3D:
 
             # Get background color for saving
             bg_color = self._parse_background_color(background_color)
-            bg_color_mpl = tuple(bg_color) if isinstance(bg_color, np.ndarray) else bg_color
 
-            fig.savefig(save_file, dpi=dpi, bbox_inches="tight", pad_inches=0, facecolor=bg_color_mpl)
+            # Same crop as bbox_inches="tight", without the extra draw (and image resampling) savefig does to find it
+            tight_bbox = fig.get_tightbbox()
+            fig.savefig(save_file, dpi=dpi, bbox_inches=tight_bbox, pad_inches=0, facecolor=bg_color)
 
             self.logger.info(f"Figure saved to: {save_file}")
 
@@ -244,93 +318,83 @@ class MaskRenderer3D:
 
         return fig
 
-    def _parse_background_color(self, background_color: Union[str, Tuple[float, float, float]]) -> np.ndarray:
-        """Parse background color string or tuple to RGB array."""
+    def _parse_background_color(
+        self, background_color: Union[str, Tuple[float, float, float]]
+    ) -> Tuple[float, float, float]:
+        """Parse background color string or tuple to an RGB tuple."""
         if isinstance(background_color, tuple):
-            return np.array(background_color)
-
-        color_map = {
-            "black": np.array([0.0, 0.0, 0.0]),
-            "white": np.array([1.0, 1.0, 1.0]),
-            "grey": np.array([0.5, 0.5, 0.5]),
-            "gray": np.array([0.5, 0.5, 0.5]),
-        }
+            return background_color
 
-        return color_map.get(background_color.lower(), np.array([0.0, 0.0, 0.0]))
+        return _BACKGROUND_COLORS.get(background_color.lower(), _BACKGROUND_COLORS["black"])
 
     def _get_view_config(self, direction: str) -> dict:
         """Get ray casting configuration for a view direction."""
-        configs = {
-            "anterior": {"ray_axis": 1, "ax1": 2, "ax2": 0, "forward": True},
-            "posterior": {"ray_axis": 1, "ax1": 2, "ax2": 0, "forward": False},
-            "right": {"ray_axis": 0, "ax1": 2, "ax2": 1, "forward": True},
-            "left": {"ray_axis": 0, "ax1": 2, "ax2": 1, "forward": False},
-            "superior": {"ray_axis": 2, "ax1": 1, "ax2": 0, "forward": False},
-            "inferior": {"ray_axis": 2, "ax1": 1, "ax2": 0, "forward": True},
-        }
-        return configs[direction.lower()]
+        return _VIEW_CONFIGS[direction.lower()]
 
     def _get_default_light_direction(self, direction: str) -> np.ndarray:
         """Get default light direction based on view direction."""
-        light_dirs = {
-            "anterior": np.array([0.3, 0.7, 0.3]),
-            "posterior": np.array([0.3, -0.7, 0.3]),
-            "right": np.array([0.7, 0.3, 0.3]),
-            "left": np.array([-0.7, 0.3, 0.3]),
-            "superior": np.array([0.3, 0.3, 0.7]),
-            "inferior": np.array([0.3, 0.3, -0.7]),
-        }
-        return light_dirs[direction.lower()]
+        return np.array(_LIGHT_DIRECTIONS[direction.lower()])
 
     def _get_aspect_ratio(self, direction: str) -> float:
         """Calculate aspect ratio for the projection based on spacing."""
-        view_axes = {
-            "anterior": (2, 0),
-            "posterior": (2, 0),
-            "right": (2, 1),
-            "left": (2, 1),
-            "superior": (1, 0),
-            "inferior": (1, 0),
-        }
-        vert_axis, horiz_axis = view_axes[direction.lower()]
-        aspect_ratio = self.spacing[vert_axis] / self.spacing[horiz_axis]
+        view_config = self._get_view_config(direction)
+        aspect_ratio = self.spacing[view_config["ax1"]] / self.spacing[view_config["ax2"]]
 
         self.logger.info(f"  Aspect ratio: {aspect_ratio:.3f}")
 
         return aspect_ratio
 
-    def _ray_cast_all_masks(self, direction: str) -> Tuple[list, list, list]:
-        """Ray cast all masks and return depths, normals, and valid masks."""
-        all_depths, all_normals, all_valid_masks = [], [], []
+    def _scratch_buffers(self, ray_axis: int, proj_shape: tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get the depth, normal and valid mask stacks of a projection, allocated once per ray axis.
+
+        :param int ray_axis: Axis the rays travel along; opposite views share their buffers.
+        :param tuple proj_shape: Shape of the projection.
+        :return Tuple[np.ndarray, np.ndarray, np.ndarray]: Depth, normal and valid mask stacks, one row per mask.
+        """
+        if ray_axis not in self._scratch:
+            num_masks = len(self.mask_arrays)
+            self._scratch[ray_axis] = (
+                np.empty((num_masks, *proj_shape), dtype=np.float32),
+                np.empty((num_masks, *proj_shape, 3), dtype=np.float32),
+                np.empty((num_masks, *proj_shape), dtype=bool),
+            )
+        return self._scratch[ray_axis]
+
+    def _ray_cast_all_masks(self, direction: str, proj_shape: tuple) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Ray cast all masks and return stacked depths, normals, and valid masks."""
+        all_depths, all_normals, all_valid_masks = self._scratch_buffers(
+            self._get_view_config(direction)["ray_axis"], proj_shape
+        )
 
         for mask_idx, mask_array in enumerate(self.mask_arrays):
             self.logger.info(f"  Ray casting mask {mask_idx}...")
 
-            depth_map, normal_map, valid_mask = self._ray_cast_single(mask_array, direction)
-            all_depths.append(depth_map)
-            all_normals.append(normal_map)
-            all_valid_masks.append(valid_mask)
+            self._ray_cast_single(
+                mask_array,
+                direction,
+                self._hit_arrays[mask_idx],
+                all_depths[mask_idx],
+                all_normals[mask_idx],
+                all_valid_masks[mask_idx],
+            )
 
-            self.logger.info(f"    Valid pixels: {np.sum(valid_mask)}")
+            self.logger.info(f"    Valid pixels: {np.count_nonzero(all_valid_masks[mask_idx])}")
 
         return all_depths, all_normals, all_valid_masks
 
     def _compute_frontmost_surfaces(
-        self, all_depths: list, all_normals: list, all_valid_masks: list, proj_shape: tuple
+        self, all_depths: np.ndarray, all_normals: np.ndarray, all_valid_masks: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Determine which mask is frontmost at each pixel."""
-        frontmost_mask = np.full(proj_shape, -1, dtype=int)
-        frontmost_depth = np.full(proj_shape, np.inf)
-        frontmost_normal = np.zeros((*proj_shape, 3))
+        # The first mask wins ties, as argmin returns the first minimum
+        np.copyto(all_depths, np.inf, where=~all_valid_masks)
+        winner = all_depths.argmin(axis=0)
+        frontmost_depth = np.take_along_axis(all_depths, winner[None], axis=0)[0]
+        any_valid = frontmost_depth < np.inf
+        frontmost_mask = np.where(any_valid, winner, -1)
 
-        for mask_idx in range(len(self.mask_arrays)):
-            valid = all_valid_masks[mask_idx]
-            depths = all_depths[mask_idx]
-            closer = valid & (depths < frontmost_depth)
-
-            frontmost_mask[closer] = mask_idx
-            frontmost_depth[closer] = depths[closer]
-            frontmost_normal[closer] = all_normals[mask_idx][closer]
+        frontmost_normal = np.take_along_axis(all_normals, winner[None, ..., None], axis=0)[0]
+        frontmost_normal[~any_valid] = 0
 
         return frontmost_mask, frontmost_depth, frontmost_normal
 
@@ -346,33 +410,16 @@ class MaskRenderer3D:
         background_color: Union[str, Tuple[float, float, float]],
     ) -> np.ndarray:
         """Render the final RGB image with lighting."""
-        proj_shape = frontmost_mask.shape
-        final_image_rgb = np.zeros((*proj_shape, 3))
-
-        for mask_idx in range(len(self.mask_arrays)):
-            is_frontmost = frontmost_mask == mask_idx
-
-            if np.any(is_frontmost):
-                image_rgb = self._compute_lighting(
-                    frontmost_depth,
-                    frontmost_normal,
-                    is_frontmost,
-                    light_direction,
-                    ambient,
-                    diffuse,
-                    mask_colors[mask_idx],
-                )
-                final_image_rgb[is_frontmost] = image_rgb[is_frontmost]
-
-        # Apply background
-        bg_rgb = self._parse_background_color(background_color)
-        final_valid_mask = frontmost_mask >= 0
+        intensity = self._compute_lighting(
+            frontmost_depth, frontmost_normal, frontmost_mask, len(self.mask_arrays), light_direction, ambient, diffuse
+        )
 
-        final_image = np.zeros((*proj_shape, 3))
-        for i in range(3):
-            final_image[:, :, i] = np.where(final_valid_mask, final_image_rgb[:, :, i], bg_rgb[i])
+        # The background is the last palette row, so label -1 picks it up at full intensity
+        bg_rgb = self._parse_background_color(background_color)
+        palette = np.vstack([np.asarray(mask_colors[: len(self.mask_arrays)]), bg_rgb]).astype(np.float32)
+        intensity[frontmost_mask < 0] = 1.0
 
-        return final_image
+        return intensity[..., None] * palette[frontmost_mask]
 
     def _create_figure(
         self,
@@ -406,27 +453,20 @@ class MaskRenderer3D:
 
         # Set background color
         bg_color = self._parse_background_color(background_color)
-        bg_color_mpl = tuple(bg_color) if isinstance(bg_color, np.ndarray) else bg_color
-        ax.set_facecolor(bg_color_mpl)
-        fig.patch.set_facecolor(bg_color_mpl)
+        ax.set_facecolor(bg_color)
+        fig.patch.set_facecolor(bg_color)
 
-        plt.tight_layout(pad=0)
+        # Lay out once; without a layout engine left on the figure, savefig does not draw it again to re-run it
+        fig.tight_layout(pad=0)
+        fig.set_layout_engine(None)
         plt.close()  # Close to prevent auto-display
 
         return fig
 
     def _draw_bounding_box(self, ax, direction: str, color: Tuple[float, float, float], alpha: float):
         """Draw a bounding box showing the image volume boundaries."""
-        view_axes = {
-            "anterior": (2, 0),
-            "posterior": (2, 0),
-            "right": (2, 1),
-            "left": (2, 1),
-            "superior": (1, 0),
-            "inferior": (1, 0),
-        }
-        vert_axis, horiz_axis = view_axes[direction.lower()]
-        height, width = self.shape[vert_axis], self.shape[horiz_axis]
+        view_config = self._get_view_config(direction)
+        height, width = self.shape[view_config["ax1"]], self.shape[view_config["ax2"]]
 
         front_rect = plt.Rectangle((0, 0), width, height, fill=False, edgecolor=color, linewidth=2, alpha=alpha)
         ax.add_patch(front_rect)
@@ -435,102 +475,90 @@ class MaskRenderer3D:
         ax.set_xlim(-width * padding, width * (1 + padding))
         ax.set_ylim(-height * padding, height * (1 + padding))
 
-    def _ray_cast_single(self, mask_array: np.ndarray, direction: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-        """Perform ray casting to generate depth map and surface normals."""
+    def _ray_cast_single(
+        self,
+        mask_array: np.ndarray,
+        direction: str,
+        hits: np.ndarray,
+        depth_map: np.ndarray,
+        normal_map: np.ndarray,
+        valid_mask: np.ndarray,
+    ) -> None:
+        """Perform ray casting, writing the depth map, surface normals and valid mask into the given buffers."""
         config = self._get_view_config(direction)
-        proj_shape = (self.shape[config["ax1"]], self.shape[config["ax2"]])
-
-        depth_map = np.zeros(proj_shape, dtype=float)
-        normal_map = np.zeros((*proj_shape, 3), dtype=float)
-        valid_mask = np.zeros(proj_shape, dtype=bool)
-
-        for i in range(proj_shape[0]):
-            for j in range(proj_shape[1]):
-                ray_line = self._extract_ray(mask_array, i, j, config)
-                nonzero_indices = np.where(ray_line > 0)[0]
-
-                if len(nonzero_indices) > 0:
-                    depth_idx = nonzero_indices[0]
-                    depth_map[i, j] = depth_idx
-                    valid_mask[i, j] = True
-
-                    actual_depth = depth_idx if config["forward"] else (self.shape[config["ray_axis"]] - 1 - depth_idx)
-                    coords_3d = [0, 0, 0]
-                    coords_3d[config["ax1"]] = i
-                    coords_3d[config["ax2"]] = j
-                    coords_3d[config["ray_axis"]] = actual_depth
-
-                    normal_map[i, j] = self._estimate_normal(coords_3d, mask_array)
-
-        return depth_map, normal_map, valid_mask
-
-    def _extract_ray(self, mask_array: np.ndarray, i: int, j: int, config: dict) -> np.ndarray:
-        """Extract a ray line from the mask array."""
         ray_axis = config["ray_axis"]
-        forward = config["forward"]
-
-        if ray_axis == 0:
-            ray_line = mask_array[:, j, i]
-        elif ray_axis == 1:
-            ray_line = mask_array[j, :, i]
-        else:  # ray_axis == 2
-            ray_line = mask_array[j, i, :]
-
-        return ray_line if forward else ray_line[::-1]
-
-    def _estimate_normal(self, coords: list, mask_array: np.ndarray) -> np.ndarray:
-        """Estimate surface normal at a point using finite differences."""
-        x, y, z = coords
-        gradient = np.zeros(3)
 
+        # First hit along every ray at once, reducing the contiguous (Z, Y, X) hits; the remaining axes come out
+        # as (ax1, ax2) since ax1 > ax2 in all views
+        hits_axis = 2 - ray_axis
+        if not config["forward"]:
+            hits = np.flip(hits, axis=hits_axis)
+        depth_idx = hits.argmax(axis=hits_axis)
+        np.any(hits, axis=hits_axis, out=valid_mask)
+        depth_map[...] = depth_idx  # argmax is 0 for rays without a hit
+
+        # 3D coordinates of the hit voxels, for the normals
+        hit_i, hit_j = np.nonzero(valid_mask)
+        hit_depth = depth_idx[hit_i, hit_j]
+        coords_3d = [None, None, None]
+        coords_3d[config["ax1"]] = hit_i
+        coords_3d[config["ax2"]] = hit_j
+        coords_3d[ray_axis] = hit_depth if config["forward"] else (self.shape[ray_axis] - 1 - hit_depth)
+
+        normal_map.fill(0)
+        normal_map[hit_i, hit_j] = self._estimate_normals(coords_3d, mask_array)
+
+    def _estimate_normals(self, coords: list, mask_array: np.ndarray) -> np.ndarray:
+        """Estimate surface normals at points using finite differences, clamped at the volume edges.
+
+        :param list coords: X, Y and Z index arrays of the points.
+        :param np.ndarray mask_array: Mask in (X, Y, Z) order.
+        :return np.ndarray: Unit normals, shape (N, 3); (0, 0, 1) where the gradient vanishes.
+        """
+        gradient = np.empty((len(coords[0]), 3), dtype=np.float32)
         for axis in range(3):
-            c = [x, y, z]
-            c_plus = c.copy()
-            c_plus[axis] = min(self.shape[axis] - 1, c[axis] + 1)
-            val_plus = mask_array[c_plus[0], c_plus[1], c_plus[2]]
-
-            c_minus = c.copy()
-            c_minus[axis] = max(0, c[axis] - 1)
-            val_minus = mask_array[c_minus[0], c_minus[1], c_minus[2]]
-
-            gradient[axis] = float(val_plus) - float(val_minus)
-
-        norm = np.linalg.norm(gradient)
-        return gradient / norm if norm > 1e-6 else np.array([0.0, 0.0, 1.0])
+            c_plus = list(coords)
+            c_plus[axis] = np.minimum(self.shape[axis] - 1, coords[axis] + 1)
+            c_minus = list(coords)
+            c_minus[axis] = np.maximum(0, coords[axis] - 1)
+            gradient[:, axis] = mask_array[tuple(c_plus)].astype(np.float32) - mask_array[tuple(c_minus)]
+
+        norm = np.linalg.norm(gradient, axis=1)
+        normals = np.zeros_like(gradient)
+        normals[:, 2] = 1.0
+        defined = norm > 1e-6
+        normals[defined] = gradient[defined] / norm[defined, None]
+        return normals
 
     def _compute_lighting(
         self,
         depth_map: np.ndarray,
         normal_map: np.ndarray,
-        valid_mask: np.ndarray,
+        label_map: np.ndarray,
+        num_masks: int,
         light_direction: np.ndarray,
         ambient: float,
         diffuse: float,
-        color: Tuple[float, float, float],
     ) -> np.ndarray:
-        """Compute lighting and create RGB image."""
-        h, w = depth_map.shape
-        image = np.zeros((h, w, 3))
-
-        # Normalize depth for depth-based shading
-        depth_normalized = np.zeros_like(depth_map)
-        if np.any(valid_mask):
-            valid_depths = depth_map[valid_mask]
-            if valid_depths.max() > valid_depths.min():
-                depth_normalized[valid_mask] = (depth_map[valid_mask] - valid_depths.min()) / (
-                    valid_depths.max() - valid_depths.min()
-                )
-            else:
-                depth_normalized[valid_mask] = 0.5
-
-        # Compute lighting
-        for i in range(h):
-            for j in range(w):
-                if valid_mask[i, j]:
-                    normal = normal_map[i, j]
-                    diffuse_intensity = max(0, np.dot(normal, light_direction))
-                    depth_factor = 1.0 - 0.4 * depth_normalized[i, j]
-                    intensity = np.clip((ambient + diffuse * diffuse_intensity) * depth_factor, 0, 1)
-                    image[i, j] = [c * intensity for c in color]
-
-        return image
+        """Compute the lighting intensity of every pixel, zero where ``label_map`` is -1."""
+        # Shade the valid pixels only, as 1-D arrays, and scatter them back into the projection
+        valid_idx = np.flatnonzero(label_map >= 0)
+        labels = label_map.ravel()[valid_idx]
+        depths = depth_map.ravel()[valid_idx]
+        normals = normal_map.reshape(-1, 3)[valid_idx]
+
+        # Normalize depth per mask for depth-based shading
+        depth_min = np.full(num_masks, np.inf, dtype=depths.dtype)
+        depth_max = np.full(num_masks, -np.inf, dtype=depths.dtype)
+        np.minimum.at(depth_min, labels, depths)
+        np.maximum.at(depth_max, labels, depths)
+        depth_min, depth_range = depth_min[labels], (depth_max - depth_min)[labels]
+        flat = depth_range <= 0
+        depth_normalized = np.where(flat, 0.5, (depths - depth_min) / np.where(flat, 1, depth_range))
+
+        diffuse_intensity = np.maximum(normals @ light_direction.astype(np.float32), 0)
+        depth_factor = 1.0 - 0.4 * depth_normalized
+
+        intensity = np.zeros(label_map.size, dtype=np.float32)
+        intensity[valid_idx] = np.clip((ambient + diffuse * diffuse_intensity) * depth_factor, 0, 1)
+        return intensity.reshape(label_map.shape)
@@ -1,13 +1,37 @@
 """XNAT Wrapper."""
 
+import hashlib
 import logging
 import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator, List, Optional, Tuple, Union
+from typing import Generator, Iterator, List, Mapping, Optional, Tuple, Union
+from zipfile import ZipFile
 
 import xnat
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
+from urllib3.util.retry import Retry
+
+
+def _iter_files(root: Union[str, Path], suffix: Optional[str] = None) -> Iterator[str]:
+    """Yield the paths of the files below ``root`` whose name ends with ``suffix``.
+
+    :param Union[str, Path] root: Directory to walk.
+    :param Optional[str] suffix: File name ending to keep, defaults to None for all files
+    :return Iterator[str]: File paths, using the cached ``DirEntry`` type instead of a stat per entry.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and (suffix is None or entry.name.endswith(suffix)):
+                    yield entry.path
 
 
 class XNATManager:
@@ -39,6 +63,7 @@ class XNATManager:
         self.project = project or os.getenv("XNAT_PROJECT", "")
         self.session = None
         self.session_connected = False
+        self._connection_depth = 0
         self.subject_label_lookup = {}
         self.subject_label_list = []
         self.logger = logger or self._create_default_logger()
@@ -67,27 +92,53 @@ class XNATManager:
 
     def __enter__(self):
         """Enter context."""
-        self.connect()
+        self._acquire_connection()
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         """Exit context."""
         if exc_type:
             self.logger.error(f"Exception: {exc_type.__name__} - {exc_value}")
-        self.disconnect()
+        self._release_connection()
         return exc_type is None
 
+    def _acquire_connection(self):
+        """Connect if needed and count one more context using the session."""
+        self.connect()
+        self._connection_depth += 1
+
+    def _release_connection(self):
+        """Count one context less, disconnecting when the outermost context exits."""
+        self._connection_depth -= 1
+        if self._connection_depth == 0:
+            self.disconnect()
+
     def connect(self):
         """Establishes a session with the XNAT server."""
         if not self.session_connected:
             try:
                 self.session = xnat.connect(self._host, user=self._username, password=self._password)
+                self._mount_http_adapter()
                 self.session_connected = True
                 self.logger.info("Connected to XNAT.")
             except Exception as e:
                 self.logger.error(f"Failed to connect to XNAT: {e}")
                 raise
 
+    def _mount_http_adapter(self):
+        """Widen the connection pool of the session and retry on gateway errors with backoff.
+
+        The default adapter keeps 10 connections per host, so concurrent downloads queue for a connection and open
+        new TLS connections once the pool overflows.
+        """
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=5, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+        )
+        self.session.interface.mount("https://", adapter)
+        self.session.interface.mount("http://", adapter)
+
     def disconnect(self):
         """Terminates the session with the XNAT server."""
         if self.session and self.session_connected:
@@ -97,20 +148,21 @@ class XNATManager:
 
     @contextmanager
     def get_connection(self):
-        """Context manager for XNAT connection."""
+        """Context manager for XNAT connection, reentrant: only the outermost context disconnects."""
+        self._acquire_connection()
         try:
-            self.connect()
             yield self
         finally:
-            self.disconnect()
+            self._release_connection()
 
     def get_patient_lookup_dict(self):
-        """Makes the subject label lookup dict."""
+        """Makes the subject label lookup dict, from one query for the ID and label of all subjects."""
         with self.get_connection():
-            subject_label_lookup = {
-                value.label: key for key, value in self.session.projects[self.project].subjects.items()
-            }
-            self.subject_label_lookup = dict(sorted(subject_label_lookup.items(), key=lambda item: item[0]))
+            response = self.session.get(
+                f"/data/projects/{self.project}/subjects", query={"columns": "ID,label", "format": "json"}
+            )
+            rows = response.json()["ResultSet"]["Result"]
+            self.subject_label_lookup = dict(sorted((row["label"], row["ID"]) for row in rows))
             self.subject_label_list = list(self.subject_label_lookup.keys())
             self.logger.info(f"Loaded {len(self.subject_label_list)} subjects.")
 
@@ -137,9 +189,10 @@ class XNATManager:
                 self.logger.warning(f"Subject label '{resume_from}' not found.")
                 return
 
-        with tqdm(subject_list, colour="red") as pbar:
+        # Redraw at most once a second, and not at all when stderr is not a terminal (disable=None)
+        with tqdm(subject_list, colour="red", mininterval=1.0, disable=None) as pbar:
             for label in pbar:
-                pbar.set_description(f"Processing Subject: {label}")
+                pbar.set_description(f"Processing Subject: {label}", refresh=False)
                 try:
                     experiment = self.get_experiment(label)
                     yield label, experiment
@@ -163,6 +216,8 @@ class XNATManager:
     def upload_to_resource(self, experiment, resource_label: str, file_path: Union[str, Path]):
         """Upload a file to the specified resource. If the file already exists, it will be replaced.
 
+        A remote file with the same MD5 digest is kept as is, so reruns do not upload unchanged files again.
+
         :param _type_ experiment: The experiment object or identifier.
         :param str resource_label: Label of the resource to upload the file to.
         :param Union[str, Path] file_path: Path to the file to be uploaded.
@@ -176,10 +231,28 @@ class XNATManager:
 
         try:
             resource = self.get_or_create_resource(experiment, resource_label)
+        except Exception as e:
+            self.logger.error(f"Failed to upload '{file_path.name}' to resource '{resource_label}': {e}")
+            raise RuntimeError(f"Failed to upload resource: {e}")
+        self._upload_one(resource, resource_label, file_path, resource.files)
 
-            # Delete the file if it already exists in the resource
-            if file_path.name in resource.files:
-                resource.files[file_path.name].delete()
+    def _upload_one(self, resource, resource_label: str, file_path: Path, existing: Mapping):
+        """Upload a file to a resource, replacing a remote file of the same name unless it has the same MD5 digest.
+
+        :param (xnat resource object) resource: the target resource.
+        :param str resource_label: Label of the resource, for the log messages.
+        :param Path file_path: Path to the file to be uploaded.
+        :param Mapping existing: Remote files of the resource by name, the live listing or a snapshot of it.
+        :raises RuntimeError: If the upload fails.
+        """
+        try:
+            # Delete the file if it already exists in the resource, unless it is the same file
+            if file_path.name in existing:
+                remote_file = existing[file_path.name]
+                if remote_file.digest and remote_file.digest == self._md5_digest(file_path):
+                    self.logger.debug(f"'{file_path.name}' is unchanged in resource '{resource_label}', skipped.")
+                    return
+                remote_file.delete()
                 self.logger.debug(f"Deleted existing file '{file_path.name}' from resource '{resource_label}'.")
 
             # Upload the file
@@ -190,6 +263,20 @@ class XNATManager:
             self.logger.error(f"Failed to upload '{file_path.name}' to resource '{resource_label}': {e}")
             raise RuntimeError(f"Failed to upload resource: {e}")
 
+    @staticmethod
+    def _md5_digest(file_path: Path, chunk_size: int = 1 << 20) -> str:
+        """MD5 hex digest of a file, read in chunks to keep large NIfTI files out of memory.
+
+        :param Path file_path: File to hash.
+        :param int chunk_size: Bytes read at a time, defaults to 1 MiB
+        :return str: The hex digest, as XNAT stores it in the resource catalog.
+        """
+        md5 = hashlib.md5()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                md5.update(chunk)
+        return md5.hexdigest()
+
     def upload_directory(
         self, experiment, resource_label: str, source_dir: Union[str, Path], file_type: Optional[str] = None
     ):
@@ -208,15 +295,15 @@ class XNATManager:
             raise FileNotFoundError(f"The source directory '{source_path}' does not exist or is not a directory.")
 
         if file_type:
-            files = source_path.rglob(f"*{file_type}")
             message = f"All '{file_type}' files uploaded from {source_path.name} to {resource_label}."
         else:
-            files = source_path.rglob("*")
             message = f"All files uploaded from {source_path.name} to {resource_label}."
 
-        for file in files:
-            if file.is_file():
-                self.upload_to_resource(experiment, resource_label, file)
+        # List the resource and its files once, instead of once per uploaded file
+        resource = self.get_or_create_resource(experiment, resource_label)
+        existing = {remote_file.path: remote_file for remote_file in resource.files.values()}
+        for file in _iter_files(source_path, file_type):
+            self._upload_one(resource, resource_label, Path(file), existing)
 
         self.logger.info(message)
 
@@ -230,23 +317,51 @@ class XNATManager:
             experiment.resources[resource_label].delete()
             self.logger.info(f"Deleted Resource {resource_label}.")
 
-    def download_files(self, dest_dir: Union[str, Path], files: List, desc: Optional[str] = None):
-        """Download files from XNAT.
+    def download_files(self, dest_dir: Union[str, Path], files: List, desc: Optional[str] = None, max_workers: int = 8):
+        """Download files from XNAT, several at a time over the session's connection pool.
 
         :param Union[str, Path] dest_dir: destination directory.
         :param List files:list of xnat file objects.
         :param Optional[str] desc: Description for progress bar, defaults to None
+        :param int max_workers: Concurrent downloads, defaults to 8 (the session keeps up to 64 connections per host)
         """
         dest_dir = Path(dest_dir)
         dest_dir.mkdir(parents=True, exist_ok=True)
 
-        with tqdm(files, colour="red", desc=f"Downloading {desc or 'Files'}", leave=False) as pbar:
-            for file in pbar:
+        with (
+            ThreadPoolExecutor(max_workers=max_workers) as executor,
+            tqdm(total=len(files), colour="red", desc=f"Downloading {desc or 'Files'}", leave=False) as pbar,
+        ):
+            futures = {executor.submit(file.download, dest_dir / file.name, verbose=False): file for file in files}
+            for future in as_completed(futures):
+                file = futures[future]
                 try:
-                    file.download(dest_dir / file.name, verbose=False)
+                    future.result()
                     self.logger.debug(f"Downloaded {file.name} to {dest_dir}.")
                 except Exception as e:
                     self.logger.warning(f"Failed to download {file.name}: {e}")
+                pbar.update()
+
+    def download_zip(self, dest_dir: Union[str, Path], xnat_object):
+        """Download all files of a scan or resource as one zip and unpack them flat into the destination directory.
+
+        :param Union[str, Path] dest_dir: destination directory.
+        :param (xnat scan or resource object) xnat_object: the object whose files to download.
+        """
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryFile() as zip_stream:
+            xnat_object.xnat_session.download_stream(xnat_object.uri + "/files", zip_stream, format="zip")
+
+            # The archive nests the files under experiment/scan/resource folders, keep only the file names
+            with ZipFile(zip_stream) as zip_file:
+                for member in zip_file.infolist():
+                    if member.is_dir():
+                        continue
+                    with zip_file.open(member) as source, open(dest_dir / Path(member.filename).name, "wb") as target:
+                        shutil.copyfileobj(source, target, 1 << 20)
+                    self.logger.debug(f"Downloaded {Path(member.filename).name} to {dest_dir}.")
 
     def download_resources(self, dest_dir: Union[str, Path], resource):
         """Download xnat resource.
@@ -254,7 +369,11 @@ class XNATManager:
         :param Union[str, Path] dest_dir: destination directory.
         :param (xnat resource object) resource: the target xant resource object.
         """
-        self.download_files(dest_dir, list(resource.files.values()))
+        try:
+            self.download_zip(dest_dir, resource)
+        except Exception as e:
+            self.logger.warning(f"Zip download of resource {resource.label} failed ({e}), downloading file by file.")
+            self.download_files(dest_dir, list(resource.files.values()))
 
     def download_scan(self, dest_dir: Union[str, Path], scan):
         """Downlaod xnat scan.
@@ -262,7 +381,11 @@ class XNATManager:
         :param Union[str, Path] dest_dir: destination directory.
         :param (xnat scan object) scan: the target xnat scan object.
         """
-        self.download_files(dest_dir, list(scan.files.values()), desc=scan.modality)
+        try:
+            self.download_zip(dest_dir, scan)
+        except Exception as e:
+            self.logger.warning(f"Zip download of scan {scan.id} failed ({e}), downloading file by file.")
+            self.download_files(dest_dir, list(scan.files.values()), desc=scan.modality)
 
     def download_modality(self, experiment, dest_dir: Union[str, Path], modality: Union[str, list]):
         """Downlaod scans of specified modality.
@@ -279,13 +402,14 @@ class XNATManager:
 
         for scan in experiment.scans.values():
             try:
-                files = list(scan.files.values())
-                if not files:
-                    self.logger.warning(f"No files found in scan {scan.id}. Skipping.")
-                    continue
-
-                first_file = files[0]
-                file_modality = scan.modality or getattr(first_file, "modality", None)
+                file_modality = scan.modality
+                # List the files only when the scan does not tell its modality
+                if not file_modality:
+                    files = list(scan.files.values())
+                    if not files:
+                        self.logger.warning(f"No files found in scan {scan.id}. Skipping.")
+                        continue
+                    file_modality = getattr(files[0], "modality", None)
 
                 if file_modality in modality:
                     self.logger.info(f"Downloading scan {scan.id} with modality '{file_modality}'.")
@@ -2,8 +2,12 @@
 
 import datetime
 import json
+import logging
+import os
 import re
 import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -12,14 +16,206 @@ from decide.dcm import DICOMData, ImageConvertor, ImageValidator, RTStruct
 from decide.dcm.image_fixes import interpolate_missing_slices
 from decide.mask import MaskPostProcessor
 from decide.paths import LOG_DIR
-from decide.utils.logger import setup_logger
+from decide.utils.logger import configure_logging, setup_logger
 from decide.utils.utils import move_files_to_directory
 from decide.xnat import XNATManager
 
 # Load environment variables from the .env file
 load_dotenv()
 
+# GTV ROI names, leaving out the lung ones
+GTV_PATTERN = re.compile(r"(?=.*\bGTV\w*)(?!.*LUNG)", re.IGNORECASE | re.DOTALL)
+
+# Patients converted at the same time, each one keeps its DICOM data on disk
+MAX_PARALLEL_PATIENTS = min(os.cpu_count() or 1, 4)
+# The patients share the CPUs for reading their DICOM headers
+DICOM_READ_WORKERS = max(1, (os.cpu_count() or 1) // MAX_PARALLEL_PATIENTS)
+# The prefetch thread and the patient workers share one xnatpy session, whose
+# requests session and listing caches are not thread-safe, so the XNAT calls take
+# turns. Plastimatch still overlaps with the downloads and uploads.
+XNAT_LOCK = threading.Lock()
+
+
+class PatientLogger(logging.LoggerAdapter):
+    """Prefix the messages with the patient ID, patients log at the same time."""
+
+    def process(self, msg, kwargs):
+        """Put the patient ID in front of the message."""
+        return f"[{self.extra['patient_id']}] {msg}", kwargs
+
+
+def download_patient(myxnat, patient_id, tempdir, logger):
+    """Download all scans of the patient's first experiment to tempdir/patient_id."""
+    with XNAT_LOCK:
+        # Get Experiment, curretly takes the first experiment, assumes only one exp.
+        logger.info(f"Getting the first Experiment of Patient: {patient_id}")
+        myexperiment = myxnat.get_experiment(patient_id)
+        # Download all Scans
+        logger.info(f"Downloading DICOM data of Patient: {patient_id}")
+        (tempdir / patient_id).mkdir(parents=True, exist_ok=True)
+        myexperiment.download_dir(tempdir / patient_id)
+    return myexperiment
+
+
+def prefetch_patients(myxnat, patient_ids, logger):
+    """Yield (patient_id, temporary directory, download future) per patient.
+
+    The next patient downloads in the background while the caller processes the
+    current one, so the network and plastimatch overlap. The caller bounds how
+    many patients are on disk by how fast it asks for the next one.
+    """
+    with ThreadPoolExecutor(max_workers=1) as downloader:
+        pending = None
+        for patient_id in patient_ids:
+            tempdir = tempfile.TemporaryDirectory()
+            download = downloader.submit(
+                download_patient, myxnat, patient_id, Path(tempdir.name), logger
+            )
+            if pending is not None:
+                yield pending
+            pending = (patient_id, tempdir, download)
+        if pending is not None:
+            yield pending
+
+
+def process_patient(
+    myxnat, patient_id, patient_tempdir, download, my_logger, plastimatch_logger
+):
+    """Convert and upload one patient, return the RTSTRUCTs that failed.
+
+    Runs on a worker thread; plastimatch runs as a subprocess, so several
+    patients convert at the same time.
+    """
+    my_logger = PatientLogger(my_logger, {"patient_id": patient_id})
+    plastimatch_logger = PatientLogger(plastimatch_logger, {"patient_id": patient_id})
+    missed_patients = []
+    my_logger.info(f"Started with Patient: {patient_id}")
+    with patient_tempdir as tempdir:
+        tempdir = Path(tempdir)
+        # Wait for the download, patients download one after the other
+        myexperiment = download.result()
+
+        # DICOM
+        my_logger.info("Collecting DICOM Metadata")
+        dcmdata = DICOMData(
+            tempdir / patient_id, logger=my_logger, max_workers=DICOM_READ_WORKERS
+        )
+
+        my_logger.info("Cleaning DICOM Data")
+        patient_info = dcmdata.get_patient(patient_id)
+
+        rtstruct_list = patient_info.get_modality("RTSTRUCT")
+        rtstruct_count = len(rtstruct_list)
+
+        # What if thre are more than 1 RTSTRUCTS with a CT!
+        if rtstruct_count > 1:
+            my_logger.warning(
+                f"Found {rtstruct_count} RTSTRUCTS, will consider only one that has an associated CT"
+            )
+
+        for rtstruct_num, dicom_rtstruct in enumerate(rtstruct_list):
+            ct = dicom_rtstruct.get_ct()
+            if ct:
+                try:
+                    my_logger.info("Cleaning DICOM Data: CT")
+                    move_files_to_directory(
+                        dicom_rtstruct.get_files(),
+                        tempdir / patient_id / "RTSTRUCT",
+                    )
+                    # More than 1 RTSTRUCT & is it the same CT?
+
+                    move_files_to_directory(ct.get_files(), tempdir / patient_id / "CT")
+
+                    # Vlidating CT DICOM data, detectes problems early.
+                    my_logger.info("CT: Validation Overview")
+                    validator = ImageValidator(logger=my_logger)
+                    validator.validate_image(tempdir / patient_id / "CT")
+
+                    # Converting to NIfTI, the segmentation model needs it.
+                    my_logger.info("Converting CT to nifti")
+                    plastimatch_logger.info(
+                        f"========== Patinet {patient_id} CT =========="
+                    )
+                    ImageConvertor.dcm_img_to_nifti_platimatch(
+                        tempdir / patient_id / "CT",
+                        tempdir / "image" / f"{patient_id}.nii.gz",
+                        logger=plastimatch_logger,
+                    )
+
+                    # Upload NIfTI Image to XNAT
+                    with XNAT_LOCK:
+                        myxnat.delete_resource(myexperiment, "decide_image")
+                        myxnat.upload_directory(
+                            experiment=myexperiment,
+                            resource_label="decide_image",
+                            source_dir=tempdir / "image",
+                            file_type=".nii.gz",
+                        )
+
+                    my_logger.info("Cleaning DICOM Data: RTSTRUCT")
+                    # RTSTRUCT
+                    rtstruct = RTStruct(
+                        rtstruct_path=tempdir / patient_id / "RTSTRUCT",
+                        logger=my_logger,
+                    )
+                    # Find only the GTVs.
+                    gtv_names = [
+                        name
+                        for name in rtstruct.roi_dict.keys()
+                        if GTV_PATTERN.match(name)
+                    ]
+                    my_logger.info(f"GTVs Found: {gtv_names}")
+
+                    rtstruct.prune_rtstruct_rois(gtv_names)
+                    rtstruct.save_rtstruct(rtstruct.rtstruct_path)
+
+                    # Make 3D Maks and Combine.
+                    with tempfile.TemporaryDirectory() as gtv_temp_dir:
+                        my_logger.info("Converting RTSTRUCT to nifti")
+                        plastimatch_logger.info(
+                            f"========== Patinet {patient_id} RTSTRUCT =========="
+                        )
+                        ImageConvertor.dcm_rtstruct_to_nifti_platimatch(
+                            str(rtstruct.rtstruct_path),
+                            str(tempdir / patient_id / "CT"),
+                            output_prefix=gtv_temp_dir,
+                            logger=plastimatch_logger,
+                        )
+
+                        for roi_mask in Path(gtv_temp_dir).iterdir():
+                            interpolate_missing_slices(roi_mask, roi_mask, my_logger)
+
+                        MaskPostProcessor.combine_binary_masks(
+                            [i for i in Path(gtv_temp_dir).iterdir()],
+                            tempdir / "gtvs" / "gtv_total.nii.gz",
+                        )
+
+                    # Upload NIfTI GTV to XNAT
+                    with XNAT_LOCK:
+                        myxnat.delete_resource(myexperiment, "decide_gtvs")
+                        myxnat.upload_directory(
+                            experiment=myexperiment,
+                            resource_label="decide_gtvs",
+                            source_dir=tempdir / "gtvs",
+                            file_type=".nii.gz",
+                        )
+                    # Stop with the first RTSTRUCT
+                    break
+                except Exception as e:
+                    my_logger.error(
+                        f"Encountered Error [{e}] while processing Patient {patient_id} RTSTRUCT-{rtstruct_num}"
+                    )
+                    missed_patients.append(
+                        {"PatientID": patient_id, "RTSTRUCT": {rtstruct_num}}
+                    )
+
+    my_logger.info(f"Done for Patinet {patient_id}")
+    return missed_patients
+
+
 if __name__ == "__main__":
+    # package logger, the decide modules log through it
+    configure_logging(level=logging.INFO)
     # main logger
     my_logger = setup_logger(
         "Prepare Structures",
@@ -40,134 +236,23 @@ if __name__ == "__main__":
     myxnat = XNATManager(load_patients=True, logger=my_logger)
 
     with myxnat.get_connection():
-        for patient_id in myxnat.subject_label_list:
-            my_logger.info(f"Started with Patient: {patient_id}")
-            with tempfile.TemporaryDirectory() as tempdir:
-                tempdir = Path(tempdir)
-                # Get Experiment, curretly takes the first experiment, assumes only one exp.
-                my_logger.info(f"Getting the first Experiment of Patient: {patient_id}")
-                myexperiment = myxnat.get_experiment(patient_id)
-                # Download all Scans
-                my_logger.info(f"Downloading DICOM data of Patient: {patient_id}")
-                (tempdir / patient_id).mkdir(parents=True, exist_ok=True)
-                myexperiment.download_dir(tempdir / patient_id)
-
-                # DICOM
-                my_logger.info("Collecting DICOM Metadata")
-                dcmdata = DICOMData(tempdir / patient_id, logger=my_logger)
-
-                my_logger.info("Cleaning DICOM Data")
-                patient_info = dcmdata.get_patient(patient_id)
-
-                rtstruct_list = patient_info.get_modality("RTSTRUCT")
-                rtstruct_count = len(rtstruct_list)
-
-                # What if thre are more than 1 RTSTRUCTS with a CT!
-                if rtstruct_count > 1:
-                    my_logger.warning(
-                        f"Found {rtstruct_count} RTSTRUCTS, will consider only one that has an associated CT"
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_PATIENTS) as workers:
+            for patient in prefetch_patients(
+                myxnat, myxnat.subject_label_list, my_logger
+            ):
+                # Bound the patients on disk: wait for one to finish first
+                if len(in_flight) >= MAX_PARALLEL_PATIENTS:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        missed_patients.extend(future.result())
+                in_flight.add(
+                    workers.submit(
+                        process_patient, myxnat, *patient, my_logger, plastimatch_logger
                     )
-
-                for rtstruct_num, dicom_rtstruct in enumerate(rtstruct_list):
-                    ct = dicom_rtstruct.get_ct()
-                    if ct:
-                        try:
-                            my_logger.info("Cleaning DICOM Data: CT")
-                            move_files_to_directory(
-                                dicom_rtstruct.get_files(),
-                                tempdir / patient_id / "RTSTRUCT",
-                            )
-                            # More than 1 RTSTRUCT & is it the same CT?
-
-                            move_files_to_directory(
-                                ct.get_files(), tempdir / patient_id / "CT"
-                            )
-
-                            # Vlidating CT DICOM data, detectes problems early.
-                            my_logger.info("CT: Validation Overview")
-                            validator = ImageValidator(logger=my_logger)
-                            validator.validate_image(tempdir / patient_id / "CT")
-
-                            # Converting to NIfTI, the segmentation model needs it.
-                            my_logger.info("Converting CT to nifti")
-                            plastimatch_logger.info(
-                                f"========== Patinet {patient_id} CT =========="
-                            )
-                            ImageConvertor.dcm_img_to_nifti_platimatch(
-                                tempdir / patient_id / "CT",
-                                tempdir / "image" / f"{patient_id}.nii.gz",
-                                logger=plastimatch_logger,
-                            )
-
-                            # Upload NIfTI Image to XNAT
-                            myxnat.delete_resource(myexperiment, "decide_image")
-                            myxnat.upload_directory(
-                                experiment=myexperiment,
-                                resource_label="decide_image",
-                                source_dir=tempdir / "image",
-                                file_type=".nii.gz",
-                            )
-
-                            my_logger.info("Cleaning DICOM Data: RTSTRUCT")
-                            # RTSTRUCT
-                            rtstruct = RTStruct(
-                                rtstruct_path=tempdir / patient_id / "RTSTRUCT",
-                                logger=my_logger,
-                            )
-                            # Find only the GTVs.
-                            gtv_names = [
-                                name
-                                for name in rtstruct.roi_dict.keys()
-                                if re.search(r"\bGTV\w*", name, re.IGNORECASE)
-                                and not re.search(r"LUNG", name, re.IGNORECASE)
-                            ]
-                            my_logger.info(f"GTVs Found: {gtv_names}")
-
-                            rtstruct.prune_rtstruct_rois(gtv_names)
-                            rtstruct.save_rtstruct(rtstruct.rtstruct_path)
-
-                            # Make 3D Maks and Combine.
-                            with tempfile.TemporaryDirectory() as gtv_temp_dir:
-                                my_logger.info("Converting RTSTRUCT to nifti")
-                                plastimatch_logger.info(
-                                    f"========== Patinet {patient_id} RTSTRUCT =========="
-                                )
-                                ImageConvertor.dcm_rtstruct_to_nifti_platimatch(
-                                    str(rtstruct.rtstruct_path),
-                                    str(tempdir / patient_id / "CT"),
-                                    output_prefix=gtv_temp_dir,
-                                    logger=plastimatch_logger,
-                                )
-
-                                for roi_mask in Path(gtv_temp_dir).iterdir():
-                                    interpolate_missing_slices(
-                                        roi_mask, roi_mask, my_logger
-                                    )
-
-                                MaskPostProcessor.combine_binary_masks(
-                                    [i for i in Path(gtv_temp_dir).iterdir()],
-                                    tempdir / "gtvs" / "gtv_total.nii.gz",
-                                )
-
-                            # Upload NIfTI GTV to XNAT
-                            myxnat.delete_resource(myexperiment, "decide_gtvs")
-                            myxnat.upload_directory(
-                                experiment=myexperiment,
-                                resource_label="decide_gtvs",
-                                source_dir=tempdir / "gtvs",
-                                file_type=".nii.gz",
-                            )
-                            # Stop with the first RTSTRUCT
-                            break
-                        except Exception as e:
-                            my_logger.error(
-                                f"Encountered Error [{e}] while processing Patient {patient_id} RTSTRUCT-{rtstruct_num}"
-                            )
-                            missed_patients.append(
-                                {"PatientID": patient_id, "RTSTRUCT": {rtstruct_num}}
-                            )
-
-            my_logger.info(f"Done for Patinet {patient_id}")
+                )
+            for future in in_flight:
+                missed_patients.extend(future.result())
         my_logger.info("Disconneting from XNAT")
 
         # Save the missed patients information.